@@ -1,3 +1,21 @@
+"""
+Conversion of the PrimeKG knowledge graph CSV files to RDF.
+
+Besides the command line script in primekgtordf.main, the conversion can be
+embedded into other pipelines via primekgtordf.iter_triples(), which lazily
+yields batches of triples (or N-Triples lines):
+
+    import primekgtordf
+
+    for lines in primekgtordf.iter_triples(
+            'nodes.csv',
+            'edges.csv',
+            disease_features='disease_features.csv',
+            drug_features='drug_features.csv',
+            batch_size=10000,
+            as_ntriples=True):
+        ...
+"""
 PRIMEKG_URI_PREFIX = 'https://zitniklab.hms.harvard.edu/projects/PrimeKG/'
 NCBI_PREFIX = 'https://ftp.ncbi.nih.gov/'
 DRUGBANK_PREFIX = 'https://www.drugbank.com'
@@ -7,3 +25,13 @@ GO_PREFIX = 'http://purl.obolibrary.org/obo/go'
 CTD_PREFIX = 'https://ctdbase.org/'
 REACTOME_PREFIX = 'https://reactome.org/'
 UBERON_PREFIX = 'http://purl.obolibrary.org/obo/uberon'
+
+
+def __getattr__(name: str):
+    # imported on first use, so importing the package does not import the
+    # whole conversion machinery
+    if name == 'iter_triples':
+        from primekgtordf.stream import iter_triples
+        return iter_triples
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,160 @@
+"""
+Export of the parsed PrimeKG nodes and relations as NumPy arrays for graph
+machine learning (e.g. link prediction). The arrays are built from the same
+NodesReader and RelationsReader instances that feed the RDF conversion, so the
+input files are only parsed once.
+
+Every array is written as a separate .npy file so that it can be memory-mapped
+with numpy.load(path, mmap_mode='r'):
+
+    <output_dir>/
+        meta.json                  code tables for node types, node sources
+                                   and relation types
+        node_type.npy              int8, node index -> NodeType code
+        node_source.npy            int8, node index -> NodeSource code
+        node_uri.npy               unicode, node index -> node URI
+        edge_src.npy               int32, subject node index per edge
+        edge_dst.npy               int32, object node index per edge
+        edge_type.npy              int8, RelationType code per edge
+        csr/<RelationType>.indptr.npy   int64, CSR row pointers
+        csr/<RelationType>.indices.npy  int32, CSR column indices
+"""
+import json
+import logging
+import os
+
+import numpy as np
+
+from primekgtordf.node import NodesReader, NodeType, NodeSource
+from primekgtordf.relation import RelationsReader, RelationType
+
+logger = logging.getLogger(__name__)
+
+_node_types = list(NodeType)
+_node_sources = list(NodeSource)
+_relation_types = list(RelationType)
+
+_node_type_codes = {t: code for code, t in enumerate(_node_types)}
+_node_source_codes = {s: code for code, s in enumerate(_node_sources)}
+_relation_type_codes = {t: code for code, t in enumerate(_relation_types)}
+
+
+def get_node_arrays(nodes_reader: NodesReader) -> dict:
+    """
+    Returns the node type codes, node source codes and node URIs indexed by
+    node index. Gaps in the node index space get the code -1 and an empty
+    URI.
+    """
+    num_nodes = nodes_reader.get_num_nodes()
+
+    node_type = np.full(num_nodes, -1, dtype=np.int8)
+    node_source = np.full(num_nodes, -1, dtype=np.int8)
+    node_uris = [''] * num_nodes
+
+    for node in nodes_reader.get_nodes():
+        node_type[node.node_index] = _node_type_codes[node.node_type]
+        node_source[node.node_index] = _node_source_codes[node.node_source]
+        node_uris[node.node_index] = str(node.get_uri())
+
+    return {
+        'node_type': node_type,
+        'node_source': node_source,
+        'node_uri': np.array(node_uris, dtype=np.str_),
+    }
+
+
+def get_edge_arrays(relations_reader: RelationsReader) -> dict:
+    """
+    Returns the typed edge list, i.e. subject node index, object node index
+    and RelationType code per relation, in input order.
+    """
+    relations = relations_reader.get_relations()
+    num_edges = len(relations)
+
+    edge_src = np.empty(num_edges, dtype=np.int32)
+    edge_dst = np.empty(num_edges, dtype=np.int32)
+    edge_type = np.empty(num_edges, dtype=np.int8)
+
+    for i, relation in enumerate(relations):
+        edge_src[i] = relation.subject.node_index
+        edge_dst[i] = relation.object_.node_index
+        edge_type[i] = _relation_type_codes[relation.relation_type]
+
+    return {
+        'edge_src': edge_src,
+        'edge_dst': edge_dst,
+        'edge_type': edge_type,
+    }
+
+
+def get_csr_adjacency(edge_arrays: dict, num_nodes: int) -> dict:
+    """
+    Builds one compressed sparse row adjacency per RelationType from the typed
+    edge list. Returns a dict mapping the RelationType to its (indptr, indices)
+    arrays. Relation types without any edge are left out.
+    """
+    edge_src = edge_arrays['edge_src']
+    edge_dst = edge_arrays['edge_dst']
+    edge_type = edge_arrays['edge_type']
+
+    adjacency = {}
+    for code, relation_type in enumerate(_relation_types):
+        mask = edge_type == code
+        if not mask.any():
+            continue
+
+        src = edge_src[mask]
+        dst = edge_dst[mask]
+
+        # stable sort keeps the input order of the neighbors of each node
+        order = np.argsort(src, kind='stable')
+        indices = dst[order]
+
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+
+        adjacency[relation_type] = (indptr, indices)
+
+    return adjacency
+
+
+def export_arrays(
+        nodes_reader: NodesReader,
+        relations_reader: RelationsReader,
+        output_dir_path: str
+):
+    csr_dir_path = os.path.join(output_dir_path, 'csr')
+    os.makedirs(csr_dir_path, exist_ok=True)
+
+    node_arrays = get_node_arrays(nodes_reader)
+    edge_arrays = get_edge_arrays(relations_reader)
+    num_nodes = len(node_arrays['node_type'])
+
+    for name, array in {**node_arrays, **edge_arrays}.items():
+        np.save(os.path.join(output_dir_path, name + '.npy'), array)
+
+    adjacency = get_csr_adjacency(edge_arrays, num_nodes)
+    for relation_type, (indptr, indices) in adjacency.items():
+        np.save(
+            os.path.join(csr_dir_path, relation_type.name + '.indptr.npy'),
+            indptr
+        )
+        np.save(
+            os.path.join(csr_dir_path, relation_type.name + '.indices.npy'),
+            indices
+        )
+
+    meta = {
+        'num_nodes': num_nodes,
+        'num_edges': len(edge_arrays['edge_type']),
+        'node_types': [t.name for t in _node_types],
+        'node_sources': [s.name for s in _node_sources],
+        'relation_types': [t.name for t in _relation_types],
+        'csr_relation_types': [t.name for t in adjacency],
+    }
+    with open(os.path.join(output_dir_path, 'meta.json'), 'w') as meta_file:
+        json.dump(meta, meta_file, indent=2)
+
+    logger.info(
+        f'Exported arrays for {num_nodes} nodes and {meta["num_edges"]} edges '
+        f'to {output_dir_path}')
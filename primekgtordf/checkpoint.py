@@ -0,0 +1,156 @@
+"""
+Checkpoints of streaming conversions. While the outputs are written, the
+byte offsets up to which each input file has been converted are committed
+together with the sizes of the outputs written so far. An interrupted
+conversion can then be resumed by truncating the outputs to the committed
+sizes and continuing to read each input file at its committed offset, which
+yields the same output as an uninterrupted run.
+"""
+import dataclasses
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+_checkpoint_file_suffix = '.checkpoint'
+
+
+class CheckpointMismatchException(Exception):
+    pass
+
+
+class IncompatibleCheckpointException(Exception):
+    pass
+
+
+def get_checkpoint_file_path(output_file_path: str) -> str:
+    return output_file_path + _checkpoint_file_suffix
+
+
+@dataclasses.dataclass
+class Checkpoint:
+    # input file path -> size in bytes, to detect changed inputs on resume
+    input_file_sizes: dict
+    # input file path -> modification time in ns, e.g. to detect inputs
+    # edited without changing their size
+    input_file_mtimes: dict
+    # options which change the output, e.g. the selected subset
+    options: dict
+    # InputKind value -> byte offset after the last converted row
+    input_offsets: dict = dataclasses.field(default_factory=dict)
+    # output file path -> size in bytes
+    output_sizes: dict = dataclasses.field(default_factory=dict)
+    # nodes whose describing triples were already written
+    seen_node_indexes: list = dataclasses.field(default_factory=list)
+    counters: dict = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def create(cls, input_file_paths: list, options: dict = None):
+        stats = {path: os.stat(path) for path in input_file_paths}
+
+        return cls(
+            input_file_sizes={path: stat.st_size for path, stat in stats.items()},
+            input_file_mtimes={path: stat.st_mtime_ns for path, stat in stats.items()},
+            options=options or {}
+        )
+
+    @classmethod
+    def load(cls, checkpoint_file_path: str):
+        with open(checkpoint_file_path) as checkpoint_file:
+            fields = json.load(checkpoint_file)
+
+        try:
+            return cls(**fields)
+        except TypeError:
+            raise IncompatibleCheckpointException(
+                f'Checkpoint {checkpoint_file_path} is from an incompatible '
+                f'version. Remove it to convert from scratch')
+
+    def save(self, checkpoint_file_path: str):
+        tmp_file_path = checkpoint_file_path + '.tmp'
+        with open(tmp_file_path, 'w') as tmp_file:
+            json.dump(dataclasses.asdict(self), tmp_file)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+
+        # atomic, so a crash while saving leaves the previous checkpoint
+        os.replace(tmp_file_path, checkpoint_file_path)
+
+    def check_inputs(self, input_file_paths: list):
+        current = Checkpoint.create(input_file_paths)
+        if current.input_file_sizes != self.input_file_sizes:
+            raise CheckpointMismatchException(
+                f'Input files {list(current.input_file_sizes)} do not match '
+                f'the checkpointed ones {list(self.input_file_sizes)}')
+
+        if current.input_file_mtimes != self.input_file_mtimes:
+            changed_file_paths = [
+                path for path, mtime in current.input_file_mtimes.items()
+                if self.input_file_mtimes[path] != mtime
+            ]
+            raise CheckpointMismatchException(
+                f'Input files {changed_file_paths} were modified after the '
+                f'checkpoint was written')
+
+    def check_options(self, options: dict):
+        # round-tripped through JSON like the checkpointed options
+        options = json.loads(json.dumps(options))
+        changed_names = [
+            name for name in sorted(set(options) | set(self.options))
+            if options.get(name) != self.options.get(name)
+        ]
+        if changed_names:
+            checkpointed = {name: self.options.get(name) for name in changed_names}
+            raise CheckpointMismatchException(
+                f'Options {changed_names} differ from the checkpointed ones '
+                f'{checkpointed}')
+
+    def count(self, name: str, value: int):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+
+class CheckpointingWriter:
+    """
+    Hands serialized batches to the output writer(s) and commits a checkpoint
+    every interval_seconds. A checkpoint is only committed after the output
+    written so far has been synced to disk.
+    """
+    def __init__(
+            self,
+            output_writer,
+            checkpoint: Checkpoint,
+            checkpoint_file_path: str,
+            interval_seconds: float = 60.0
+    ):
+        self._output_writer = output_writer
+        self._checkpoint = checkpoint
+        self._checkpoint_file_path = checkpoint_file_path
+        self._interval_seconds = interval_seconds
+        self._last_commit = time.monotonic()
+
+    def write(self, batch):
+        self._output_writer.write(batch)
+
+        self._checkpoint.input_offsets[batch.input_kind.value] = batch.end_offset
+        self._checkpoint.seen_node_indexes.extend(batch.new_node_indexes)
+        self._checkpoint.count('rows', len(batch.rows))
+        self._checkpoint.count('triples', batch.num_triples)
+        if batch.num_duplicates > 0:
+            self._checkpoint.count('duplicates', batch.num_duplicates)
+
+        if time.monotonic() - self._last_commit >= self._interval_seconds:
+            self.commit()
+
+        return batch
+
+    def commit(self):
+        self._checkpoint.output_sizes = self._output_writer.sync()
+        self._checkpoint.save(self._checkpoint_file_path)
+        self._last_commit = time.monotonic()
+
+        logger.info(
+            f'Committed checkpoint at output sizes '
+            f'{self._checkpoint.output_sizes} ({self._checkpoint.counters})')
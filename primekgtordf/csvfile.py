@@ -0,0 +1,87 @@
+import csv
+from operator import itemgetter
+from typing import BinaryIO
+
+
+class _OffsetLines:
+    """
+    Iterator over the decoded lines of a file opened in binary mode, which
+    keeps track of the byte offset right after the last line read. Since
+    csv.reader only reads as many lines as the current record spans, the
+    offset after reading a record is the offset of its end.
+    """
+    def __init__(self, csv_file: BinaryIO, offset: int):
+        self._lines = iter(csv_file)
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = next(self._lines)
+        self.offset += len(line)
+
+        return line.decode('utf-8')
+
+
+def iter_csv_records(file_path: str, start_offset: int = 0):
+    """
+    Yields (row, end_offset) tuples for the CSV records of a file, where
+    end_offset is the byte offset in the file right after the record. Reading
+    can be continued at any such offset, e.g. to resume an interrupted
+    conversion or to jump to a record found via an index.
+
+    The file is read in binary mode since the file position of text files is
+    not available while iterating over them.
+    """
+    with open(file_path, 'rb') as csv_file:
+        csv_file.seek(start_offset)
+
+        lines = _OffsetLines(csv_file, start_offset)
+        for row in csv.reader(lines, delimiter=',', quotechar='"'):
+            if not row:
+                # empty line
+                continue
+
+            yield row, lines.offset
+
+
+def iter_csv_records_at(file_path: str, offsets: list):
+    """
+    Yields (row, end_offset) tuples for the CSV records starting at the given
+    byte offsets, in the order of the offsets.
+    """
+    with open(file_path, 'rb') as csv_file:
+        for offset in offsets:
+            csv_file.seek(offset)
+
+            lines = _OffsetLines(csv_file, offset)
+            row = next(csv.reader(lines, delimiter=',', quotechar='"'), None)
+            if not row:
+                continue
+
+            yield row, lines.offset
+
+
+def iter_projected_rows(file_path: str, column_indexes: list):
+    """
+    Yields the values of the given columns for each CSV record of a file, in
+    the order of column_indexes. Missing trailing fields are returned as
+    empty strings.
+    """
+    num_columns = max(column_indexes) + 1
+    project = itemgetter(*column_indexes)
+    # itemgetter returns a tuple for several indexes, the bare value otherwise
+    is_single_column = len(column_indexes) == 1
+
+    with open(file_path) as csv_file:
+        for row in csv.reader(csv_file, delimiter=',', quotechar='"'):
+            if not row:
+                # empty line
+                continue
+
+            if len(row) < num_columns:
+                row += [''] * (num_columns - len(row))
+
+            values = project(row)
+            yield [values] if is_single_column else list(values)
@@ -0,0 +1,277 @@
+"""
+De-duplication of the N-Triples lines of streaming conversions. Unlike an
+rdflib Graph, a streaming conversion writes every triple it generates, so
+repeated edges and feature rows as well as the class and source declarations
+repeated for each node end up in the output several times.
+
+Lines are de-duplicated in two groups: The node triples (types, sources and
+names of nodes) and vocabulary triples are bounded by the number of nodes and
+de-duplicated exactly in memory. The much larger group of relation and
+feature triples is de-duplicated with one of
+
+    memory  an exact in-memory set of the lines
+    bloom   a Bloom filter of fixed size; with the given error rate, unique
+            lines are dropped as false positives
+    disk    an exact set of the lines in a temporary SQLite database, which
+            only keeps a bounded page cache in memory
+"""
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+
+from rdflib import RDF
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.vocab import has_node_name, has_source
+
+logger = logging.getLogger(__name__)
+
+dedup_modes = ['memory', 'bloom', 'disk']
+
+_node_uri_prefix = ('<' + PRIMEKG_URI_PREFIX + 'node/').encode('utf-8')
+_node_predicates = {
+    term.n3().encode('utf-8') for term in [RDF.type, has_source, has_node_name]
+}
+
+# maximum number of SQLite query parameters
+_max_query_params = 999
+
+
+class UnknownDedupModeException(Exception):
+    pass
+
+
+def get_dedup_db_file_path(output_file_path: str) -> str:
+    return output_file_path + '.dedup.sqlite'
+
+
+def is_node_line(line: bytes) -> bool:
+    """
+    Checks whether an N-Triples line belongs to the bounded group of node and
+    vocabulary triples, i.e. does not have a node as subject or has a node as
+    subject and a node describing predicate.
+    """
+    if not line.startswith(_node_uri_prefix):
+        return True
+
+    _, predicate, _ = line.split(b' ', 2)
+
+    return predicate in _node_predicates
+
+
+class MemoryLineSet:
+    def __init__(self):
+        self._lines = set()
+
+    def add(self, lines: list) -> list:
+        """
+        Adds the lines and returns for each of them whether it was new.
+        """
+        is_new = []
+        for line in lines:
+            is_new.append(line not in self._lines)
+            self._lines.add(line)
+
+        return is_new
+
+    def close(self):
+        self._lines = None
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Sized to hold capacity lines with the given false positive rate.
+        """
+        self._num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._num_hashes = max(1, round(self._num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self._num_bits + 7) // 8)
+
+        logger.info(
+            f'Bloom filter with {self._num_bits // 8} bytes and '
+            f'{self._num_hashes} hash functions')
+
+    def _add_line(self, line: bytes) -> bool:
+        digest = hashlib.blake2b(line, digest_size=16).digest()
+        # double hashing: h1 + i * h2 for the i-th hash function
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+
+        bits = self._bits
+        is_new = False
+        for i in range(self._num_hashes):
+            position = (h1 + i * h2) % self._num_bits
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                is_new = True
+
+        return is_new
+
+    def add(self, lines: list) -> list:
+        return [self._add_line(line) for line in lines]
+
+    def close(self):
+        self._bits = None
+
+
+class DiskLineSet:
+    def __init__(self, db_file_path: str, cache_size: int = 256):
+        """
+        cache_size is the SQLite page cache size in MB.
+        """
+        if os.path.exists(db_file_path):
+            os.remove(db_file_path)
+        self._db_file_path = db_file_path
+
+        # used from the pipeline thread of the de-duplication stage
+        self._connection = sqlite3.connect(db_file_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode = OFF')
+        self._connection.execute('PRAGMA synchronous = OFF')
+        self._connection.execute(f'PRAGMA cache_size = -{cache_size * 1024}')
+        self._connection.execute(
+            'CREATE TABLE lines (line BLOB PRIMARY KEY) WITHOUT ROWID')
+
+    def _get_known_lines(self, lines: list) -> set:
+        known_lines = set()
+        for i in range(0, len(lines), _max_query_params):
+            chunk = lines[i:i + _max_query_params]
+            placeholders = ','.join('?' * len(chunk))
+            known_lines.update(
+                line for line, in self._connection.execute(
+                    f'SELECT line FROM lines WHERE line IN ({placeholders})', chunk))
+
+        return known_lines
+
+    def add(self, lines: list) -> list:
+        unique_lines = list(dict.fromkeys(lines))
+        known_lines = self._get_known_lines(unique_lines)
+        new_lines = [line for line in unique_lines if line not in known_lines]
+
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO lines VALUES (?)', [(line,) for line in new_lines])
+
+        is_new = []
+        new_lines = set(new_lines)
+        for line in lines:
+            is_new.append(line in new_lines)
+            # only the first occurrence within the batch is new
+            new_lines.discard(line)
+
+        return is_new
+
+    def close(self):
+        self._connection.close()
+        os.remove(self._db_file_path)
+
+
+class Deduplicator:
+    def __init__(
+            self,
+            mode: str = 'memory',
+            capacity: int = 10000000,
+            error_rate: float = 1e-6,
+            db_file_path: str = None
+    ):
+        """
+        capacity and error_rate size the Bloom filter of the bloom mode, the
+        disk mode keeps its database at db_file_path.
+        """
+        self._mode = mode
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._node_lines = set()
+
+        if mode == 'memory':
+            self._lines = MemoryLineSet()
+        elif mode == 'bloom':
+            self._lines = BloomFilter(capacity, error_rate)
+        elif mode == 'disk':
+            self._lines = DiskLineSet(db_file_path)
+        else:
+            raise UnknownDedupModeException(
+                f'Unknown de-duplication mode {mode}. Known modes: {dedup_modes}')
+
+        self.num_node_duplicates = 0
+        self.num_duplicates = 0
+
+    def get_options(self) -> dict:
+        """
+        Returns the mode, and for the bloom mode the size of the Bloom filter,
+        as JSON-serializable dict, e.g. to check that a resumed conversion
+        de-duplicates the same way.
+        """
+        options = {'mode': self._mode}
+        if self._mode == 'bloom':
+            options['capacity'] = self._capacity
+            options['error_rate'] = self._error_rate
+
+        return options
+
+    def filter_lines(self, lines: list) -> list:
+        """
+        Returns the lines not seen before, in their original order.
+        """
+        is_new = [None] * len(lines)
+        other_positions = []
+        for i, line in enumerate(lines):
+            if is_node_line(line):
+                is_new[i] = line not in self._node_lines
+                self._node_lines.add(line)
+                if not is_new[i]:
+                    self.num_node_duplicates += 1
+            else:
+                other_positions.append(i)
+
+        other_lines_new = self._lines.add([lines[i] for i in other_positions])
+        for i, line_is_new in zip(other_positions, other_lines_new):
+            is_new[i] = line_is_new
+            if not line_is_new:
+                self.num_duplicates += 1
+
+        return [line for line, line_is_new in zip(lines, is_new) if line_is_new]
+
+    def dedup(self, batch):
+        """
+        Pipeline stage removing the lines already written from a serialized
+        Batch.
+        """
+        lines = batch.data.splitlines(keepends=True)
+        new_lines = self.filter_lines(lines)
+
+        batch.num_duplicates = len(lines) - len(new_lines)
+        batch.num_triples = len(new_lines)
+        batch.data = b''.join(new_lines)
+
+        return batch
+
+    def prime(self, output_file_path: str, size: int):
+        """
+        Adds the lines of an existing output up to the given size, e.g. when
+        resuming a conversion, so lines written before are not written again.
+        """
+        lines = []
+        offset = 0
+        with open(output_file_path, 'rb') as output_file:
+            for line in output_file:
+                offset += len(line)
+                if offset > size:
+                    break
+
+                lines.append(line)
+                if len(lines) == 10000:
+                    self.filter_lines(lines)
+                    lines = []
+
+        self.filter_lines(lines)
+
+        # these are no duplicates removed by this run
+        self.num_node_duplicates = 0
+        self.num_duplicates = 0
+
+    def close(self):
+        self._lines.close()
+        self._node_lines = None
@@ -0,0 +1,349 @@
+"""
+Export of one compact JSON-LD document per node, e.g. for bulk loading into
+a search index. A document holds the name, types and source of a node, its
+disease/drug features and its neighbors grouped by relation, e.g.
+
+    {"@context": "context.jsonld", "@id": "node:9796",
+     "@type": ["primekg:Gene_Protein", "Node"], "has_node_name": "PHYHIP",
+     "has_source": "https://ftp.ncbi.nih.gov/", "ppi": ["node:7918"],
+     "@reverse": {"target": ["node:DB00001"]}}
+
+The documents are written as NDJSON (one document per line) to several
+shard files part-<shard>.ndjson, with the JSON-LD context in context.jsonld.
+
+The node index space is split into contiguous ranges, one per shard. The
+edges and feature rows are first partitioned by these ranges in a single
+pass over the input files. The shards are then assembled in parallel worker
+processes, which look up the nodes in the node table shared by the main
+process, so only the edges and features of one shard are held in memory at
+a time.
+"""
+import csv
+import json
+import logging
+import os
+from argparse import ArgumentParser
+from collections import defaultdict
+from multiprocessing import Pool
+
+from rdflib import RDF
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.disesefeatures import disease_feature_columns
+from primekgtordf.drugfeatures import drug_feature_columns
+from primekgtordf.node import NodesReader
+from primekgtordf.parquet import is_parquet_file, iter_parquet_rows
+from primekgtordf.relation import edge_columns
+from primekgtordf.sharednodes import SharedNodeTable
+from primekgtordf.vocab import get_property, get_property_abbreviations
+
+logger = logging.getLogger(__name__)
+
+_vocab_prefix = PRIMEKG_URI_PREFIX + 'vocab/'
+_node_prefix = PRIMEKG_URI_PREFIX + 'node/'
+
+_context_file_name = 'context.jsonld'
+_write_buffer_size = 1024 * 1024
+
+# partition record kinds
+_EDGE = 0
+_DISEASE_FEATURES = 1
+_DRUG_FEATURES = 2
+
+_feature_columns = {
+    _DISEASE_FEATURES: disease_feature_columns,
+    _DRUG_FEATURES: drug_feature_columns,
+}
+
+_worker_nodes_table = None
+
+
+def get_context() -> dict:
+    context = {
+        '@vocab': _vocab_prefix,
+        '@language': 'en',
+        'node': _node_prefix,
+        'primekg': PRIMEKG_URI_PREFIX,
+        'has_source': {'@type': '@id'},
+    }
+    for property_abbrv_str in get_property_abbreviations():
+        context[compact(get_property(property_abbrv_str))] = {'@type': '@id'}
+
+    for feature_columns in _feature_columns.values():
+        for column in feature_columns.columns:
+            if column.datatype is not None:
+                context[compact(column.property)] = {'@type': str(column.datatype)}
+            elif column.language is None:
+                context[compact(column.property)] = {'@language': None}
+
+    return {'@context': context}
+
+
+_compact_prefixes = [
+    (_vocab_prefix, ''),
+    (_node_prefix, 'node:'),
+    (PRIMEKG_URI_PREFIX, 'primekg:'),
+]
+
+
+def compact(uri: str) -> str:
+    for prefix, replacement in _compact_prefixes:
+        if uri.startswith(prefix):
+            return replacement + uri[len(prefix):]
+
+    return str(uri)
+
+
+def get_shard(node_index: int, num_nodes: int, num_shards: int) -> int:
+    return node_index * num_shards // num_nodes
+
+
+def get_shard_file_path(output_dir_path: str, shard: int) -> str:
+    return os.path.join(output_dir_path, f'part-{shard:05d}.ndjson')
+
+
+def _get_partition_file_path(output_dir_path: str, shard: int) -> str:
+    return os.path.join(output_dir_path, f'part-{shard:05d}.partition')
+
+
+def _iter_edge_rows(edges_file_path: str):
+    if is_parquet_file(edges_file_path):
+        for row, _ in iter_parquet_rows(edges_file_path, edge_columns):
+            yield row
+        return
+
+    with open(edges_file_path) as edges_file:
+        for row in csv.reader(edges_file, delimiter=',', quotechar='"'):
+            if row and row[0] != 'relation':
+                yield row
+
+
+def partition(
+        nodes_reader: NodesReader,
+        edges_file_path: str,
+        output_dir_path: str,
+        num_shards: int,
+        disease_features_file_path: str = None,
+        drug_features_file_path: str = None
+):
+    """
+    Writes the edges and feature rows of each shard to a partition file, as
+    JSON lines. Edges are written to the partitions of both their nodes.
+    """
+    num_nodes = nodes_reader.get_num_nodes()
+    partition_files = [
+        open(_get_partition_file_path(output_dir_path, shard), 'w', buffering=_write_buffer_size)
+        for shard in range(num_shards)
+    ]
+
+    try:
+        for row_num, (_, relation_type_abbrv, subj_node_idx, obj_node_idx) \
+                in enumerate(_iter_edge_rows(edges_file_path), start=1):
+            subj_node_idx = int(subj_node_idx)
+            obj_node_idx = int(obj_node_idx)
+
+            partition_files[get_shard(subj_node_idx, num_nodes, num_shards)].write(
+                json.dumps([_EDGE, subj_node_idx, relation_type_abbrv, obj_node_idx, True]) + '\n')
+            partition_files[get_shard(obj_node_idx, num_nodes, num_shards)].write(
+                json.dumps([_EDGE, obj_node_idx, relation_type_abbrv, subj_node_idx, False]) + '\n')
+
+            if row_num % 1000000 == 0:
+                logger.info(f'partitioned {row_num} edges')
+
+        features = [
+            (_DISEASE_FEATURES, disease_features_file_path),
+            (_DRUG_FEATURES, drug_features_file_path),
+        ]
+        for kind, features_file_path in features:
+            if features_file_path is None:
+                continue
+
+            for row in _feature_columns[kind].iter_rows(features_file_path):
+                if row[0] in ['node_index', '']:
+                    continue
+
+                node_index = int(row[0])
+                partition_files[get_shard(node_index, num_nodes, num_shards)].write(
+                    json.dumps([kind, node_index, row]) + '\n')
+
+    finally:
+        for partition_file in partition_files:
+            partition_file.close()
+
+
+def _init_worker(nodes_table_name: str):
+    global _worker_nodes_table
+    _worker_nodes_table = SharedNodeTable.attach(nodes_table_name)
+
+
+def _add_value(document: dict, key: str, value):
+    if key not in document:
+        document[key] = value
+        return
+
+    values = document[key] if isinstance(document[key], list) else [document[key]]
+    if value not in values:
+        values.append(value)
+    document[key] = values
+
+
+def get_document(node, edges: list, feature_rows: list, context_ref: str) -> dict:
+    """
+    Builds the document of a node from its (relation abbreviation, neighbor
+    node index, is outgoing) edges and (kind, values) feature rows.
+    """
+    node_uri = node.get_uri()
+    document = {'@context': context_ref, '@id': compact(node_uri), '@type': []}
+
+    for s, p, o in node.to_triples():
+        if s != node_uri:
+            continue
+        if p == RDF.type:
+            document['@type'].append(compact(o))
+        else:
+            document[compact(p)] = str(o)
+
+    for kind, values in feature_rows:
+        for _, p, o in _feature_columns[kind].get_triples(values, _worker_nodes_table):
+            _add_value(document, compact(p), str(o))
+
+    neighbors = defaultdict(list)
+    reverse_neighbors = defaultdict(list)
+    for relation_type_abbrv, neighbor_index, is_outgoing in edges:
+        neighbor_uri = compact(_worker_nodes_table.get_node_by_index(neighbor_index).get_uri())
+        key = compact(get_property(relation_type_abbrv))
+        if is_outgoing:
+            neighbors[key].append(neighbor_uri)
+        else:
+            reverse_neighbors[key].append(neighbor_uri)
+
+    document.update(neighbors)
+    if reverse_neighbors:
+        document['@reverse'] = dict(reverse_neighbors)
+
+    return document
+
+
+def _write_shard(output_dir_path: str, shard: int, num_shards: int, context_ref: str) -> int:
+    """
+    Assembles and writes the documents of all nodes of a shard in node index
+    order. Returns the number of documents written.
+    """
+    edges_by_node = defaultdict(list)
+    feature_rows_by_node = defaultdict(list)
+
+    partition_file_path = _get_partition_file_path(output_dir_path, shard)
+    with open(partition_file_path) as partition_file:
+        for line in partition_file:
+            record = json.loads(line)
+            if record[0] == _EDGE:
+                edges_by_node[record[1]].append(record[2:])
+            else:
+                feature_rows_by_node[record[1]].append((record[0], record[2]))
+    os.remove(partition_file_path)
+
+    num_nodes = _worker_nodes_table.get_num_nodes()
+    start = -(-shard * num_nodes // num_shards)
+    end = -(-(shard + 1) * num_nodes // num_shards)
+
+    num_documents = 0
+    with open(get_shard_file_path(output_dir_path, shard), 'w', buffering=_write_buffer_size) as shard_file:
+        for node_index in range(start, end):
+            try:
+                node = _worker_nodes_table.get_node_by_index(node_index)
+            except KeyError:
+                # gap in the node index space
+                continue
+
+            document = get_document(
+                node,
+                edges_by_node.get(node_index, []),
+                feature_rows_by_node.get(node_index, []),
+                context_ref
+            )
+            shard_file.write(json.dumps(document, ensure_ascii=False, separators=(',', ':')) + '\n')
+            num_documents += 1
+
+    return num_documents
+
+
+def export_documents(
+        nodes_reader: NodesReader,
+        edges_file_path: str,
+        output_dir_path: str,
+        disease_features_file_path: str = None,
+        drug_features_file_path: str = None,
+        workers: int = os.cpu_count(),
+        num_shards: int = 16,
+        context_ref: str = _context_file_name
+):
+    """
+    Writes the node documents to num_shards NDJSON files in the output
+    directory, assembled by the given number of worker processes.
+    context_ref is the @context of the documents, e.g. the URL the
+    context.jsonld file will be published at.
+    """
+    os.makedirs(output_dir_path, exist_ok=True)
+    with open(os.path.join(output_dir_path, _context_file_name), 'w') as context_file:
+        json.dump(get_context(), context_file, indent=2)
+
+    partition(
+        nodes_reader,
+        edges_file_path,
+        output_dir_path,
+        num_shards,
+        disease_features_file_path,
+        drug_features_file_path
+    )
+    logger.info(f'Partitioned the input files into {num_shards} shards')
+
+    nodes_table = SharedNodeTable.publish(nodes_reader)
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(nodes_table.get_name(),)) as pool:
+            results = [
+                pool.apply_async(_write_shard, (output_dir_path, shard, num_shards, context_ref))
+                for shard in range(num_shards)
+            ]
+            num_documents = sum(result.get() for result in results)
+    finally:
+        nodes_table.close()
+        nodes_table.unlink()
+
+    logger.info(f'Wrote {num_documents} node documents to {output_dir_path}')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    arg_parser = ArgumentParser()
+    arg_parser.add_argument('nodes_file')
+    arg_parser.add_argument('edges_file')
+    arg_parser.add_argument('output_dir')
+    arg_parser.add_argument('--diseasefeatures')
+    arg_parser.add_argument('--drugfeatures')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count())
+    arg_parser.add_argument(
+        '--shards',
+        type=int,
+        default=16,
+        help='Number of NDJSON files to split the documents into'
+    )
+    arg_parser.add_argument(
+        '--context',
+        default=_context_file_name,
+        help='@context of the documents, e.g. the URL context.jsonld is '
+             'published at'
+    )
+
+    args = arg_parser.parse_args()
+
+    export_documents(
+        NodesReader(args.nodes_file),
+        args.edges_file,
+        args.output_dir,
+        args.diseasefeatures,
+        args.drugfeatures,
+        args.workers,
+        args.shards,
+        args.context
+    )
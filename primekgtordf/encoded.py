@@ -0,0 +1,327 @@
+"""
+Dictionary-encoded intermediate format of a conversion. Every distinct term
+(node URIs, vocabulary terms, feature literals) is stored once in a term
+dictionary, and the triples are stored as fixed-width integer arrays of term
+IDs. The format is written once from the readers, after which any number of
+outputs (different RDF syntaxes, filtered subsets) can be produced by
+memory-mapped scans over the ID triples, without touching the CSV files or
+creating rdflib objects again.
+
+Files of an encoded directory:
+
+    meta.json       number of terms and triples
+    terms.bin       UTF-8 encoded terms in N-Triples syntax, concatenated
+    terms.idx       int64 offsets of the terms in terms.bin (plus end offset)
+    triples.bin     uint32 (subject ID, predicate ID, object ID) triples
+"""
+import array
+import json
+import logging
+import mmap
+import os
+from argparse import ArgumentParser
+from itertools import compress
+
+from rdflib import Dataset, Graph, URIRef
+from rdflib.util import from_n3
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.ntriples import get_term
+from primekgtordf.stream import iter_triples
+from primekgtordf.writers import graph_name, is_quad_format, normalize_format
+
+logger = logging.getLogger(__name__)
+
+_meta_file_name = 'meta.json'
+_terms_file_name = 'terms.bin'
+_terms_index_file_name = 'terms.idx'
+_triples_file_name = 'triples.bin'
+
+_write_buffer_size = 1024 * 1024
+
+
+def _encode_term(term) -> bytes:
+    return get_term(term).encode('utf-8')
+
+
+class EncodedTriplesWriter:
+    def __init__(self, encoded_dir_path: str):
+        os.makedirs(encoded_dir_path, exist_ok=True)
+        self._encoded_dir_path = encoded_dir_path
+
+        self._term_ids = {}
+        self._terms_file = open(
+            os.path.join(encoded_dir_path, _terms_file_name), 'wb',
+            buffering=_write_buffer_size)
+        self._term_offsets = array.array('q', [0])
+
+        self._triples_file = open(
+            os.path.join(encoded_dir_path, _triples_file_name), 'wb',
+            buffering=_write_buffer_size)
+        self._num_triples = 0
+
+    def _get_term_id(self, term) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            encoded_term = _encode_term(term)
+            term_id = len(self._term_ids)
+            self._term_ids[term] = term_id
+            self._terms_file.write(encoded_term)
+            self._term_offsets.append(self._term_offsets[-1] + len(encoded_term))
+
+        return term_id
+
+    def add_triples(self, triples: list):
+        ids = array.array('I')
+        for s, p, o in triples:
+            ids.append(self._get_term_id(s))
+            ids.append(self._get_term_id(p))
+            ids.append(self._get_term_id(o))
+
+        ids.tofile(self._triples_file)
+        self._num_triples += len(triples)
+
+    def close(self):
+        self._terms_file.close()
+        self._triples_file.close()
+
+        with open(os.path.join(self._encoded_dir_path, _terms_index_file_name), 'wb') as index_file:
+            self._term_offsets.tofile(index_file)
+
+        meta = {
+            'num_terms': len(self._term_ids),
+            'num_triples': self._num_triples,
+        }
+        with open(os.path.join(self._encoded_dir_path, _meta_file_name), 'w') as meta_file:
+            json.dump(meta, meta_file, indent=2)
+
+        logger.info(
+            f'Encoded {self._num_triples} triples with {len(self._term_ids)} '
+            f'distinct terms')
+
+
+def encode(
+        nodes_file_path: str,
+        edges_file_path: str,
+        encoded_dir_path: str,
+        disease_features_file_path: str = None,
+        drug_features_file_path: str = None
+):
+    writer = EncodedTriplesWriter(encoded_dir_path)
+
+    for triples in iter_triples(
+            nodes_file_path,
+            edges_file_path,
+            disease_features=disease_features_file_path,
+            drug_features=drug_features_file_path):
+        writer.add_triples(triples)
+
+    writer.close()
+
+
+class EncodedTriples:
+    """
+    Read access to an encoded directory. The ID triples are memory-mapped,
+    the (comparatively few) terms are loaded on opening.
+    """
+    def __init__(self, encoded_dir_path: str):
+        with open(os.path.join(encoded_dir_path, _meta_file_name)) as meta_file:
+            meta = json.load(meta_file)
+        self.num_terms = meta['num_terms']
+        self.num_triples = meta['num_triples']
+
+        term_offsets = array.array('q')
+        with open(os.path.join(encoded_dir_path, _terms_index_file_name), 'rb') as index_file:
+            term_offsets.fromfile(index_file, self.num_terms + 1)
+
+        with open(os.path.join(encoded_dir_path, _terms_file_name), 'rb') as terms_file:
+            terms_data = terms_file.read()
+        self._terms = [
+            terms_data[term_offsets[i]:term_offsets[i + 1]]
+            for i in range(self.num_terms)
+        ]
+        self._term_ids = {term: term_id for term_id, term in enumerate(self._terms)}
+
+        self._triples_file = open(os.path.join(encoded_dir_path, _triples_file_name), 'rb')
+        self._mmap = None
+        self._ids = memoryview(b'').cast('I')
+        if self.num_triples > 0:
+            self._mmap = mmap.mmap(self._triples_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._ids = memoryview(self._mmap).cast('I')
+
+    def close(self):
+        self._ids.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._triples_file.close()
+
+    def get_term(self, term_id: int) -> bytes:
+        """
+        Returns the term with the given ID in N-Triples syntax.
+        """
+        return self._terms[term_id]
+
+    def get_term_id(self, term) -> int:
+        """
+        Returns the ID of an rdflib term, or None if the term does not occur.
+        """
+        return self._term_ids.get(_encode_term(term))
+
+    def iter_id_triples(self, predicates: list = None, subjects: list = None):
+        """
+        Scans the ID triples and yields those with one of the given predicates
+        and subjects (rdflib terms, no restriction if None).
+        """
+        predicate_ids = None
+        if predicates is not None:
+            predicate_ids = {self.get_term_id(p) for p in predicates}
+
+        subject_ids = None
+        if subjects is not None:
+            subject_ids = {self.get_term_id(s) for s in subjects}
+
+        # strided views of the subject, predicate and object IDs, which zip,
+        # map and compress iterate without a Python-level loop per triple
+        subject_column = self._ids[0::3]
+        predicate_column = self._ids[1::3]
+        id_triples = zip(subject_column, predicate_column, self._ids[2::3])
+
+        if predicate_ids is not None and subject_ids is not None:
+            selectors = map(
+                bool.__and__,
+                map(predicate_ids.__contains__, predicate_column),
+                map(subject_ids.__contains__, subject_column))
+            id_triples = compress(id_triples, selectors)
+        elif predicate_ids is not None:
+            id_triples = compress(id_triples, map(predicate_ids.__contains__, predicate_column))
+        elif subject_ids is not None:
+            id_triples = compress(id_triples, map(subject_ids.__contains__, subject_column))
+
+        yield from id_triples
+
+    def iter_ntriples_lines(self, graph: URIRef = None, **filters):
+        """
+        Yields the (filtered) triples as N-Triples lines, or as N-Quads lines
+        if a graph is given.
+        """
+        terms = self._terms
+        end = b' .\n' if graph is None else b' ' + _encode_term(graph) + b' .\n'
+
+        for s, p, o in self.iter_id_triples(**filters):
+            yield terms[s] + b' ' + terms[p] + b' ' + terms[o] + end
+
+    def iter_rdflib_triples(self, **filters):
+        decoded = {}
+        for id_triple in self.iter_id_triples(**filters):
+            triple = []
+            for term_id in id_triple:
+                term = decoded.get(term_id)
+                if term is None:
+                    term = from_n3(self._terms[term_id].decode('utf-8'))
+                    decoded[term_id] = term
+                triple.append(term)
+
+            yield tuple(triple)
+
+
+def decode(
+        encoded_dir_path: str,
+        output_file_path: str,
+        rdf_format: str = 'nt',
+        graph: str = None,
+        predicates: list = None,
+        subjects: list = None
+):
+    """
+    Writes the (filtered) triples of an encoded directory in the given RDF
+    format. N-Triples and N-Quads are written directly from the encoded
+    terms, all other formats supported by rdflib go through a Graph of the
+    selected triples. Quad formats hold the triples in the given graph,
+    by default the PrimeKG graph of all other quad outputs.
+    """
+    # raises an exception for unknown formats before opening anything
+    rdf_format = normalize_format(rdf_format)
+    graph = graph_name if graph is None else URIRef(graph)
+
+    encoded = EncodedTriples(encoded_dir_path)
+    filters = {
+        'predicates': None if predicates is None else [URIRef(p) for p in predicates],
+        'subjects': None if subjects is None else [URIRef(s) for s in subjects],
+    }
+
+    try:
+        if rdf_format == 'ntriples':
+            with open(output_file_path, 'wb', buffering=_write_buffer_size) as output_file:
+                output_file.writelines(encoded.iter_ntriples_lines(**filters))
+
+        elif rdf_format == 'nquads':
+            with open(output_file_path, 'wb', buffering=_write_buffer_size) as output_file:
+                output_file.writelines(encoded.iter_ntriples_lines(graph=graph, **filters))
+
+        elif is_quad_format(rdf_format):
+            dataset = Dataset()
+            named_graph = dataset.graph(graph)
+            for triple in encoded.iter_rdflib_triples(**filters):
+                named_graph.add(triple)
+            dataset.serialize(destination=output_file_path, format=rdf_format)
+
+        else:
+            g = Graph()
+            for triple in encoded.iter_rdflib_triples(**filters):
+                g.add(triple)
+            g.serialize(destination=output_file_path, format=rdf_format)
+
+    finally:
+        encoded.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    arg_parser = ArgumentParser()
+    sub_parsers = arg_parser.add_subparsers(dest='command', required=True)
+
+    encode_parser = sub_parsers.add_parser(
+        'encode', help='Convert the PrimeKG CSV files to the encoded format')
+    encode_parser.add_argument('nodes_file')
+    encode_parser.add_argument('edges_file')
+    encode_parser.add_argument('encoded_dir')
+    encode_parser.add_argument('--diseasefeatures')
+    encode_parser.add_argument('--drugfeatures')
+
+    decode_parser = sub_parsers.add_parser(
+        'decode', help='Write the encoded triples in an RDF format')
+    decode_parser.add_argument('encoded_dir')
+    decode_parser.add_argument('output_rdf_file')
+    decode_parser.add_argument(
+        '--format',
+        default='nt',
+        help='nt, nq, turtle or any other format supported by rdflib'
+    )
+    decode_parser.add_argument(
+        '--graph',
+        default=PRIMEKG_URI_PREFIX,
+        help='Graph URI of N-Quads, TriG and TriX output'
+    )
+    decode_parser.add_argument('--predicates', nargs='+', help='Predicate URIs to keep')
+    decode_parser.add_argument('--subjects', nargs='+', help='Subject URIs to keep')
+
+    args = arg_parser.parse_args()
+
+    if args.command == 'encode':
+        encode(
+            args.nodes_file,
+            args.edges_file,
+            args.encoded_dir,
+            args.diseasefeatures,
+            args.drugfeatures
+        )
+    else:
+        decode(
+            args.encoded_dir,
+            args.output_rdf_file,
+            args.format,
+            args.graph,
+            args.predicates,
+            args.subjects
+        )
@@ -0,0 +1,156 @@
+"""
+Column selections of the disease and drug features files. A selection maps
+each column to convert to the vocab property (and language tag) of its
+literals. Only the selected columns are converted (and, for Parquet files,
+read), with and without streaming, so further columns can be converted
+without code changes, e.g. via
+
+    python -m primekgtordf.main ... --drug-columns description indication
+
+CSV files are still parsed completely, since finding the boundaries of the
+selected fields requires parsing all fields before them; the unselected
+fields are just dropped right after parsing.
+"""
+import dataclasses
+import logging
+from collections import Counter
+from typing import Callable
+
+from rdflib import Literal, URIRef
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.csvfile import iter_projected_rows
+from primekgtordf.node import NodesReader
+from primekgtordf.parquet import is_parquet_file, iter_parquet_rows
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownColumnException(Exception):
+    pass
+
+
+def get_feature_property(column_name: str) -> URIRef:
+    """
+    Property for columns without a dedicated one in the vocab, e.g.
+    .../vocab/has_mayo_symptoms for the mayo_symptoms column.
+    """
+    return URIRef(PRIMEKG_URI_PREFIX + 'vocab/has_' + column_name)
+
+
+@dataclasses.dataclass(frozen=True)
+class FeatureColumn:
+    """
+    Values of columns with a parse function are converted to literals of the
+    given datatype. The function returns the lexical form of the typed value
+    or None if the value is malformed.
+    """
+    name: str
+    property: URIRef
+    language: str = 'en'
+    datatype: URIRef = None
+    parse: Callable = None
+
+
+class ColumnSelection:
+    def __init__(self, header: list, columns: list):
+        """
+        header holds the names of all columns of the features file, columns
+        the FeatureColumns to convert.
+        """
+        self.header = header
+        self.columns = columns
+
+        for column in columns:
+            if column.name not in header:
+                raise UnknownColumnException(
+                    f'Unknown column {column.name}. Known columns: {header}')
+
+        # the node index always comes first
+        self.column_indexes = [header.index('node_index')] + \
+            [header.index(column.name) for column in columns]
+
+    def select(self, column_names: list):
+        """
+        Returns a selection of the given columns. Columns of this selection
+        keep their property, all others get the one of get_feature_property.
+        """
+        columns_by_name = {column.name: column for column in self.columns}
+
+        return ColumnSelection(self.header, [
+            columns_by_name.get(name, FeatureColumn(name, get_feature_property(name)))
+            for name in column_names
+        ])
+
+    def iter_rows(self, features_file_path: str, node_indexes: set = None):
+        """
+        Yields the node index and the selected values of each row of a CSV or
+        Parquet features file. For Parquet files, row groups without any of
+        the given node indexes are skipped; the rows themselves are not
+        filtered.
+        """
+        if not is_parquet_file(features_file_path):
+            yield from iter_projected_rows(features_file_path, self.column_indexes)
+            return
+
+        value_filters = None
+        if node_indexes is not None:
+            value_filters = [(['node_index'], node_indexes)]
+
+        column_names = [self.header[i] for i in self.column_indexes]
+        for row, _ in iter_parquet_rows(features_file_path, column_names, value_filters):
+            yield row
+
+    def project(self, row: list) -> list:
+        """
+        Picks the node index and the selected values from a complete row.
+        """
+        return [row[i] for i in self.column_indexes]
+
+    def _get_literal(self, column: FeatureColumn, value: str, num_malformed: Counter) -> Literal:
+        if value == '':
+            return None
+
+        if column.parse is None:
+            return Literal(value, column.language)
+
+        parsed_value = column.parse(value)
+        if parsed_value is None:
+            if num_malformed is not None:
+                num_malformed[column.name] += 1
+            return None
+
+        return Literal(parsed_value, datatype=column.datatype)
+
+    def get_triples(self, values: list, nodes_reader: NodesReader, num_malformed: Counter = None):
+        """
+        Generates the triples for the node index and selected values of one
+        row, as yielded by iter_rows() or project(). Values not accepted by
+        the parse function of their column are counted in num_malformed by
+        column name.
+        """
+        node_index = values[0]
+
+        # e.g. '27165'
+        if node_index in [None, '']:
+            # if we don't have a node index we cannot attach the
+            # features to any resource
+            return
+
+        node_uri = nodes_reader.get_node_by_index(int(node_index)).get_uri()
+
+        for column, value in zip(self.columns, values[1:]):
+            literal = self._get_literal(column, value, num_malformed)
+            if literal is not None:
+                yield node_uri, column.property, literal
+
+
+def log_num_malformed(num_malformed: Counter):
+    """
+    Logs how many values were skipped since the parse function of their
+    column did not accept them. Many free text values, e.g. half-life ranges,
+    are expected to be skipped.
+    """
+    if num_malformed:
+        logger.info('Skipped unparseable values: ' + ', '.join(
+            f'{num} {column_name}' for column_name, num in sorted(num_malformed.items())))
@@ -1,16 +1,25 @@
 """
 Script to explore and try out things. To be converted to actual modules.
 """
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 import logging
+import os
 
 from rdflib import Graph
 
 from primekgtordf import vocab
-from primekgtordf.disesefeatures import DiseaseFeaturesReader
-from primekgtordf.drugfeatures import DrugFeaturesReader
+from primekgtordf.dedup import Deduplicator, dedup_modes, get_dedup_db_file_path
+from primekgtordf.disesefeatures import DiseaseFeaturesReader, disease_feature_columns
+from primekgtordf.drugfeatures import DrugFeaturesReader, drug_feature_columns
 from primekgtordf.node import NodesReader
+from primekgtordf.parquet import is_parquet_file
 from primekgtordf.relation import RelationsReader
+from primekgtordf.sort import sort_lines
+from primekgtordf.stream import convert_streaming
+from primekgtordf.subset import SubsetFilter
+from primekgtordf.verify import get_manifest_file_path, write_manifest
+from primekgtordf.writers import UnknownOutputFormatException, is_line_based, normalize_format, \
+    parse_output_target, write_graph
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,28 +30,168 @@ def main(
         edges_file_path: str,
         output_file_path: str,
         disease_features_file_path: str = None,
-        drug_features_file_path: str = None
+        drug_features_file_path: str = None,
+        arrays_dir_path: str = None,
+        streaming: bool = False,
+        batch_size: int = 10000,
+        queue_size: int = 8,
+        resume: bool = False,
+        checkpoint_interval: float = 60.0,
+        relation_types: list = None,
+        node_types: list = None,
+        seed_node_indexes: list = None,
+        hops: int = 1,
+        workers: int = 1,
+        sort_output: bool = False,
+        sort_memory: int = 512,
+        outputs: list = None,
+        disease_columns: list = None,
+        drug_columns: list = None,
+        dedup: str = None,
+        dedup_capacity: int = 10000000,
+        dedup_error_rate: float = 1e-6
 ):
+    outputs = [
+        (normalize_format(rdf_format), path) for rdf_format, path in outputs or []
+    ]
+
+    disease_column_selection = None
+    if disease_columns is not None:
+        disease_column_selection = disease_feature_columns.select(disease_columns)
+
+    drug_column_selection = None
+    if drug_columns is not None:
+        drug_column_selection = drug_feature_columns.select(drug_columns)
+
     nodes_reader = NodesReader(nodes_file_path=nodes_file_path)
 
+    subset_filter = None
+    if relation_types is not None or node_types is not None \
+            or seed_node_indexes is not None:
+        subset_filter = SubsetFilter(
+            nodes_reader,
+            relation_types=relation_types,
+            node_types=node_types,
+            seed_node_indexes=seed_node_indexes,
+            hops=hops
+        )
+
+    if streaming:
+        conversion_output_file_path = output_file_path
+        if sort_output:
+            conversion_output_file_path = output_file_path + '.unsorted'
+
+        deduplicator = None
+        if dedup is not None:
+            deduplicator = Deduplicator(
+                dedup,
+                capacity=dedup_capacity,
+                error_rate=dedup_error_rate,
+                db_file_path=get_dedup_db_file_path(conversion_output_file_path)
+            )
+
+        try:
+            convert_streaming(
+                nodes_reader,
+                edges_file_path,
+                conversion_output_file_path,
+                disease_features_file_path,
+                drug_features_file_path,
+                batch_size=batch_size,
+                queue_size=queue_size,
+                resume=resume,
+                checkpoint_interval=checkpoint_interval,
+                subset_filter=subset_filter,
+                workers=workers,
+                outputs=outputs,
+                deduplicator=deduplicator,
+                disease_columns=disease_column_selection,
+                drug_columns=drug_column_selection
+            )
+        finally:
+            if deduplicator is not None:
+                deduplicator.close()
+
+        if sort_output:
+            sort_lines(
+                conversion_output_file_path,
+                output_file_path,
+                memory_budget=sort_memory * 1024 * 1024
+            )
+            os.remove(conversion_output_file_path)
+
+            for rdf_format, path in outputs:
+                if is_line_based(rdf_format):
+                    sort_lines(path, path, memory_budget=sort_memory * 1024 * 1024)
+
+        write_manifest(
+            get_manifest_file_path(output_file_path),
+            [('ntriples', output_file_path, True)] + [
+                (rdf_format, path, is_line_based(rdf_format))
+                for rdf_format, path in outputs
+            ]
+        )
+
+        return
+
     relations = RelationsReader(
         relations_file_path=edges_file_path,
-        nodes_reader=nodes_reader
+        nodes_reader=nodes_reader,
+        subset_filter=subset_filter
     )
 
+    # features are only converted for the nodes of the selected subset
+    node_indexes = None
+    if subset_filter is not None:
+        node_indexes = relations.get_node_indexes()
+
+    if arrays_dir_path is not None:
+        # NumPy is an optional dependency only needed for the array export
+        from primekgtordf.arrays import export_arrays
+        export_arrays(nodes_reader, relations, arrays_dir_path)
+
     g = Graph()
 
     g += vocab.get_vocab_triples()
     g += relations.to_rdf()
 
     if disease_features_file_path is not None:
-        g += DiseaseFeaturesReader(disease_features_file_path, nodes_reader).to_rdf()
+        g += DiseaseFeaturesReader(
+            disease_features_file_path,
+            nodes_reader,
+            node_indexes,
+            disease_column_selection
+        ).to_rdf()
 
     if drug_features_file_path is not None:
-        g += DrugFeaturesReader(drug_features_file_path, nodes_reader).to_rdf()
+        g += DrugFeaturesReader(
+            drug_features_file_path,
+            nodes_reader,
+            node_indexes,
+            drug_column_selection
+        ).to_rdf()
 
     g.serialize(destination=output_file_path, format='turtle')
 
+    for rdf_format, path in outputs:
+        write_graph(g, rdf_format, path)
+
+    write_manifest(
+        get_manifest_file_path(output_file_path),
+        [('turtle', output_file_path, False)] + [
+            (rdf_format, path, is_line_based(rdf_format, streaming=False))
+            for rdf_format, path in outputs
+        ],
+        num_triples=len(g)
+    )
+
+
+def _output_target(output_target: str) -> tuple:
+    try:
+        return parse_output_target(output_target)
+    except UnknownOutputFormatException as e:
+        raise ArgumentTypeError(str(e))
+
 
 if __name__ == '__main__':
     arg_parser = ArgumentParser()
@@ -51,14 +200,170 @@ if __name__ == '__main__':
     arg_parser.add_argument('output_rdf_file')
     arg_parser.add_argument('--diseasefeatures')
     arg_parser.add_argument('--drugfeatures')
-    # TODO: Make output format configurable
+    arg_parser.add_argument(
+        '--arrays-dir',
+        help='Directory to additionally export CSR adjacencies, typed edge '
+             'arrays and node arrays to (as memory-mappable .npy files)'
+    )
+    arg_parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='Convert in a pipeline of concurrent read/convert/serialize/write '
+             'stages and write N-Triples instead of building the whole graph '
+             'in memory'
+    )
+    arg_parser.add_argument('--batch-size', type=int, default=10000)
+    arg_parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=8,
+        help='Maximum number of batches waiting between two pipeline stages'
+    )
+    arg_parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted streaming conversion from its last '
+             'checkpoint'
+    )
+    arg_parser.add_argument(
+        '--checkpoint-interval',
+        type=float,
+        default=60.0,
+        help='Seconds between two checkpoints of a streaming conversion'
+    )
+    arg_parser.add_argument(
+        '--relation-types',
+        nargs='+',
+        help='Only convert relations of these types, e.g. indication '
+             'contraindication'
+    )
+    arg_parser.add_argument(
+        '--node-types',
+        nargs='+',
+        help='Only convert relations between nodes of these types, e.g. drug '
+             'disease'
+    )
+    arg_parser.add_argument(
+        '--seed-nodes',
+        nargs='+',
+        type=int,
+        help='Only convert the neighborhood of the nodes with these node '
+             'indexes'
+    )
+    arg_parser.add_argument(
+        '--hops',
+        type=int,
+        default=1,
+        help='Size of the neighborhood of the seed nodes'
+    )
+    arg_parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes converting rows in a streaming '
+             'conversion'
+    )
+    arg_parser.add_argument(
+        '--sorted',
+        action='store_true',
+        help='Write the triples of a streaming conversion in canonical '
+             '(byte-wise sorted) order'
+    )
+    arg_parser.add_argument(
+        '--sort-memory',
+        type=int,
+        default=512,
+        help='Memory budget for sorting the output in MB'
+    )
+    arg_parser.add_argument(
+        '--output',
+        action='append',
+        type=_output_target,
+        help='Additional output as format:path, e.g. nq:primekg.nq (can be '
+             'given several times). Formats are nt, nq, ttl and all other '
+             'rdflib serializations, e.g. xml, json-ld, trig and trix. '
+             'N-Quads, TriG and TriX hold the triples in the named graph '
+             '<https://zitniklab.hms.harvard.edu/projects/PrimeKG/>'
+    )
+    arg_parser.add_argument(
+        '--disease-columns',
+        nargs='+',
+        help='Disease feature columns to convert instead of the default ones, '
+             'e.g. mondo_name mayo_symptoms'
+    )
+    arg_parser.add_argument(
+        '--drug-columns',
+        nargs='+',
+        help='Drug feature columns to convert instead of the default ones, '
+             'e.g. description indication'
+    )
+
+    arg_parser.add_argument(
+        '--dedup',
+        choices=dedup_modes,
+        help='Remove duplicate triples from the output of a streaming '
+             'conversion. Node and vocabulary triples are de-duplicated '
+             'exactly; relation and feature triples in memory (exact), with a '
+             'Bloom filter (bounded memory, may drop unique triples at the '
+             '--dedup-error-rate) or in a temporary database on disk (exact)'
+    )
+    arg_parser.add_argument(
+        '--dedup-capacity',
+        type=int,
+        default=10000000,
+        help='Expected number of distinct relation and feature triples, to '
+             'size the Bloom filter'
+    )
+    arg_parser.add_argument(
+        '--dedup-error-rate',
+        type=float,
+        default=1e-6,
+        help='False positive rate of the Bloom filter'
+    )
 
     args = arg_parser.parse_args()
 
+    if args.sorted and not args.streaming:
+        arg_parser.error('--sorted requires --streaming')
+    if args.dedup and not args.streaming:
+        arg_parser.error('--dedup requires --streaming')
+    if args.resume and not args.streaming:
+        arg_parser.error('--resume requires --streaming')
+    for option in ['workers', 'queue_size', 'checkpoint_interval']:
+        if getattr(args, option) != arg_parser.get_default(option) and not args.streaming:
+            arg_parser.error(f'--{option.replace("_", "-")} requires --streaming')
+    if args.arrays_dir and args.streaming:
+        # the arrays are built from the readers of the non-streaming mode
+        arg_parser.error('--arrays-dir requires non-streaming mode')
+    input_file_paths = [
+        args.nodes_file, args.edges_file, args.diseasefeatures, args.drugfeatures]
+    if args.streaming and any(
+            path is not None and is_parquet_file(path) for path in input_file_paths):
+        arg_parser.error('Parquet inputs are not supported with --streaming')
+
     main(
         args.nodes_file,
         args.edges_file,
         args.output_rdf_file,
         args.diseasefeatures,
-        args.drugfeatures
+        args.drugfeatures,
+        args.arrays_dir,
+        args.streaming,
+        args.batch_size,
+        args.queue_size,
+        args.resume,
+        args.checkpoint_interval,
+        args.relation_types,
+        args.node_types,
+        args.seed_nodes,
+        args.hops,
+        args.workers,
+        args.sorted,
+        args.sort_memory,
+        args.output,
+        args.disease_columns,
+        args.drug_columns,
+        args.dedup,
+        args.dedup_capacity,
+        args.dedup_error_rate
     )
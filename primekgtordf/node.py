@@ -7,11 +7,15 @@ from rdflib import URIRef, Literal, XSD, Graph, RDF, OWL
 
 from primekgtordf import PRIMEKG_URI_PREFIX, NCBI_PREFIX, DRUGBANK_PREFIX, HPO_PREFIX, MONDO_PREFIX, GO_PREFIX, \
     CTD_PREFIX, REACTOME_PREFIX, UBERON_PREFIX
+from primekgtordf.parquet import is_parquet_file, iter_parquet_rows
 from primekgtordf.vocab import has_source, has_node_name, node_cls, source_cls
 
 logger = logging.getLogger(__name__)
 
 
+_node_columns = ['node_index', 'node_id', 'node_type', 'node_name', 'node_source']
+
+
 class UnknownNodeTypeStrException(Exception):
     pass
 
@@ -114,54 +118,87 @@ class Node:
     node_type: NodeType
     node_name: str
     node_source: NodeSource
+    # precomputed node URI, e.g. from a shared node table
+    uri: URIRef = dataclasses.field(default=None, compare=False, repr=False)
 
     def get_uri(self):
+        if self.uri is not None:
+            return self.uri
+
         return URIRef(PRIMEKG_URI_PREFIX + 'node/' + self.node_id)
 
-    def to_rdf(self) -> Graph:
+    def to_triples(self):
         # TODO: generic URIs or URIs based on source namespace???
         node_uri = self.get_uri()
         source_uri = URIRef(self.node_source.value)
         class_uri = URIRef(self.node_type.value)
         node_name_literal = Literal(self.node_name, 'en')
 
+        yield node_uri, has_source, source_uri
+        yield source_uri, RDF.type, source_cls
+        yield node_uri, RDF.type, class_uri
+        yield node_uri, RDF.type, node_cls
+        yield class_uri, RDF.type, OWL.Class
+        yield node_uri, has_node_name, node_name_literal
+
+    def to_rdf(self) -> Graph:
         g = Graph()
-        g.add((node_uri, has_source, source_uri))
-        g.add((source_uri, RDF.type, source_cls))
-        g.add((node_uri, RDF.type, class_uri))
-        g.add((node_uri, RDF.type, node_cls))
-        g.add((class_uri, RDF.type, OWL.Class))
-        g.add((node_uri, has_node_name, node_name_literal))
+        for triple in self.to_triples():
+            g.add(triple)
 
         return g
 
 
 class NodesReader:
     def __init__(self, nodes_file_path: str):
+        self.nodes_file_path = nodes_file_path
         self._nodes_by_index = {}
 
+        if is_parquet_file(nodes_file_path):
+            rows = iter_parquet_rows(nodes_file_path, _node_columns)
+            self._read_rows(row for row, _ in rows)
+            return
+
         with open(nodes_file_path) as nodes_file:
             csv_reader = csv.reader(nodes_file, delimiter=',', quotechar='"')
-            for node_index, node_id, node_type_str, node_name, node_src_str in csv_reader:
-                if node_index == 'node_index':
-                    # then line is the header line
-                    continue
-
-                if csv_reader.line_num % 1000 == 0:
-                    logger.info(f'read {csv_reader.line_num} lines')
-                node_type = NodeType.get_type_by_id(node_type_str.strip())
-                node_source = NodeSource.get_source_by_str(node_src_str.strip())
-                node_index = int(node_index)
-                node = Node(
-                    node_index=node_index,
-                    node_id=node_id,
-                    node_type=node_type,
-                    node_name=node_name,
-                    node_source=node_source
-                )
-                assert self._nodes_by_index.get(node_index) is None
-
-                self._nodes_by_index[node_index] = node
+            self._read_rows(csv_reader)
+
+    def _read_rows(self, rows):
+        for row_num, (node_index, node_id, node_type_str, node_name, node_src_str) \
+                in enumerate(rows, start=1):
+            if node_index == 'node_index':
+                # then line is the header line
+                continue
+
+            if row_num % 1000 == 0:
+                logger.info(f'read {row_num} lines')
+            node_type = NodeType.get_type_by_id(node_type_str.strip())
+            node_source = NodeSource.get_source_by_str(node_src_str.strip())
+            node_index = int(node_index)
+            node = Node(
+                node_index=node_index,
+                node_id=node_id,
+                node_type=node_type,
+                node_name=node_name,
+                node_source=node_source
+            )
+            assert self._nodes_by_index.get(node_index) is None
+
+            self._nodes_by_index[node_index] = node
 
     def get_node_by_index(self, node_index: int) -> Node:
         return self._nodes_by_index[node_index]
+
+    def get_nodes(self):
+        return self._nodes_by_index.values()
+
+    def get_num_nodes(self) -> int:
+        """
+        Returns the size of the node index space, i.e. the highest node index
+        plus one. PrimeKG node indexes are contiguous, so this usually equals
+        the number of nodes read.
+        """
+        if not self._nodes_by_index:
+            return 0
+
+        return max(self._nodes_by_index) + 1
@@ -0,0 +1,46 @@
+"""
+N-Triples formatting of rdflib terms, as written by the streaming conversion
+and all other line-based outputs. Equivalent to rdflib's N-Triples
+serializer, but without depending on its internals.
+"""
+from rdflib import BNode, Literal, URIRef
+
+
+class UnsupportedTermException(Exception):
+    pass
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('\n', '\\n') \
+        .replace('"', '\\"').replace('\r', '\\r') + '"'
+
+
+def get_term(term) -> str:
+    """
+    Returns the N-Triples representation of a URI, blank node or literal,
+    e.g. '<https://...>', '_:b0' or '"PHYHIP"@en'.
+    """
+    if isinstance(term, URIRef):
+        return '<' + str(term) + '>'
+
+    if isinstance(term, Literal):
+        if term.language:
+            return _quote(str(term)) + '@' + term.language
+        if term.datatype:
+            return _quote(str(term)) + '^^<' + str(term.datatype) + '>'
+        return _quote(str(term))
+
+    if isinstance(term, BNode):
+        return '_:' + str(term)
+
+    raise UnsupportedTermException(f'Cannot write {term!r} as N-Triples term')
+
+
+def get_line(triple: tuple) -> str:
+    s, p, o = triple
+
+    return get_term(s) + ' ' + get_term(p) + ' ' + get_term(o) + ' .\n'
+
+
+def to_ntriples(triples) -> str:
+    return ''.join(get_line(triple) for triple in triples)
@@ -0,0 +1,132 @@
+"""
+Parquet versions of the PrimeKG node, edge and feature tables. The readers
+accept them in place of the CSV files, given they have the same column names
+as the CSV headers. Only the needed columns are read, in record batches, and
+row groups are skipped based on their min/max statistics if a filter on the
+relation type or node index is active.
+
+pyarrow is an optional dependency (pip install primekgtordf[parquet]), which
+is imported on first use.
+"""
+import logging
+import math
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+_parquet_file_suffixes = ('.parquet', '.pq')
+
+_batch_size = 65536
+
+
+def is_parquet_file(file_path: str) -> bool:
+    return file_path.lower().endswith(_parquet_file_suffixes)
+
+
+def _get_kind(value) -> type:
+    # ints and floats compare by their numeric value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float
+
+    return type(value)
+
+
+def _may_contain(statistics, sorted_values: list) -> bool:
+    """
+    Checks whether a column chunk with the given statistics may contain any
+    of the (sorted) values. The min/max values are compared as they are,
+    e.g. as strings for a string typed node_index column, so row groups are
+    only skipped if the values are of the same kind as the column.
+    """
+    if statistics is None or not statistics.has_min_max:
+        return True
+
+    min_value = statistics.min
+    max_value = statistics.max
+    if _get_kind(min_value) != _get_kind(sorted_values[0]):
+        # e.g. int node indexes and lexicographic bounds of strings
+        return True
+
+    i = bisect_left(sorted_values, min_value)
+
+    return i < len(sorted_values) and sorted_values[i] <= max_value
+
+
+def _to_str(value) -> str:
+    # the readers expect the fields as the csv module returns them
+    if value is None:
+        return ''
+
+    if isinstance(value, float):
+        if math.isnan(value):
+            # missing value, e.g. written by pandas
+            return ''
+        if value.is_integer():
+            # e.g. a node index column turned into floats by pandas
+            return str(int(value))
+
+    return str(value)
+
+
+def iter_parquet_rows(file_path: str, columns: list, value_filters: list = None):
+    """
+    Yields (row, row_number) tuples with the string values of the given
+    columns for the rows of a Parquet file. row_number is the position of the
+    row in the file.
+
+    value_filters is a list of (column names, values) tuples. A row group is
+    only read if, for each filter, one of its columns may contain one of the
+    values according to the row group statistics. The rows themselves are not
+    filtered.
+    """
+    import pyarrow.parquet as pq
+
+    sorted_filters = []
+    for filter_columns, values in value_filters or []:
+        if not values:
+            # nothing can match
+            return
+        sorted_filters.append((filter_columns, sorted(values)))
+
+    parquet_file = pq.ParquetFile(file_path)
+    metadata = parquet_file.metadata
+    column_positions = {
+        metadata.schema.column(i).name: i for i in range(metadata.num_columns)
+    }
+
+    row_number = 0
+    num_skipped = 0
+    for row_group_index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(row_group_index)
+
+        may_match = all(
+            any(
+                _may_contain(
+                    row_group.column(column_positions[column]).statistics,
+                    sorted_values)
+                for column in filter_columns
+            )
+            for filter_columns, sorted_values in sorted_filters
+        )
+        if not may_match:
+            row_number += row_group.num_rows
+            num_skipped += 1
+            continue
+
+        record_batches = parquet_file.iter_batches(
+            batch_size=_batch_size,
+            row_groups=[row_group_index],
+            columns=columns
+        )
+        for record_batch in record_batches:
+            column_values = [
+                record_batch.column(i).to_pylist() for i in range(len(columns))
+            ]
+            for values in zip(*column_values):
+                yield [_to_str(value) for value in values], row_number
+                row_number += 1
+
+    if num_skipped > 0:
+        logger.info(
+            f'Skipped {num_skipped} of {metadata.num_row_groups} row groups '
+            f'of {file_path}')
@@ -0,0 +1,262 @@
+"""
+A small pipeline engine running the stages of a conversion (reading,
+converting, serializing, writing) concurrently. Each stage runs in its own
+thread and is connected to the next one by a bounded queue of batches, so
+blocking file reads and writes overlap with the CPU-bound triple construction
+and a slow stage applies back pressure instead of letting batches pile up in
+memory.
+
+Per-stage throughput and the occupancy of the queues in between are tracked
+to make the bottleneck stage visible: queues in front of the bottleneck stay
+full while the ones behind it stay empty.
+"""
+import dataclasses
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class PipelineAbortedException(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class StageStats:
+    name: str
+    unit: str
+    batches: int = 0
+    items: int = 0
+    busy_seconds: float = 0.0
+    input_wait_seconds: float = 0.0
+    output_wait_seconds: float = 0.0
+
+    def get_throughput(self) -> float:
+        """
+        Returns the number of items processed per second of busy time, i.e.
+        the rate the stage could sustain if it never had to wait.
+        """
+        if self.busy_seconds == 0:
+            return 0.0
+
+        return self.items / self.busy_seconds
+
+
+@dataclasses.dataclass
+class QueueStats:
+    name: str
+    maxsize: int
+    samples: int = 0
+    occupancy_sum: int = 0
+    max_occupancy: int = 0
+
+    def add_sample(self, occupancy: int):
+        self.samples += 1
+        self.occupancy_sum += occupancy
+        self.max_occupancy = max(self.max_occupancy, occupancy)
+
+    def get_mean_occupancy(self) -> float:
+        if self.samples == 0:
+            return 0.0
+
+        return self.occupancy_sum / self.samples
+
+
+class _Stage(threading.Thread):
+    def __init__(
+            self,
+            stats: StageStats,
+            func: Optional[Callable],
+            count: Callable,
+            in_queue: Optional[queue.Queue],
+            out_queue: Optional[queue.Queue],
+            abort_event: threading.Event,
+            source: Optional[Iterable] = None
+    ):
+        super().__init__(name=stats.name, daemon=True)
+        self.stats = stats
+        self.exception = None
+        self._func = func
+        self._count = count
+        self._in_queue = in_queue
+        self._out_queue = out_queue
+        self._abort_event = abort_event
+        self._source = source
+
+    def _get(self):
+        while True:
+            if self._abort_event.is_set():
+                raise PipelineAbortedException()
+            try:
+                return self._in_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _put(self, item):
+        while True:
+            if self._abort_event.is_set():
+                raise PipelineAbortedException()
+            try:
+                self._out_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _emit(self, result):
+        if self._out_queue is None:
+            return
+
+        start = time.perf_counter()
+        self._put(result)
+        self.stats.output_wait_seconds += time.perf_counter() - start
+
+    def _run_source(self):
+        iterator = iter(self._source)
+        while True:
+            start = time.perf_counter()
+            batch = next(iterator, _END)
+            self.stats.busy_seconds += time.perf_counter() - start
+
+            if batch is _END:
+                break
+
+            self.stats.batches += 1
+            self.stats.items += self._count(batch)
+            self._emit(batch)
+
+    def _run_stage(self):
+        while True:
+            start = time.perf_counter()
+            batch = self._get()
+            self.stats.input_wait_seconds += time.perf_counter() - start
+
+            if batch is _END:
+                break
+
+            start = time.perf_counter()
+            result = self._func(batch)
+            self.stats.busy_seconds += time.perf_counter() - start
+
+            self.stats.batches += 1
+            self.stats.items += self._count(batch)
+            self._emit(result)
+
+    def run(self):
+        try:
+            if self._source is not None:
+                self._run_source()
+            else:
+                self._run_stage()
+
+            if self._out_queue is not None:
+                self._put(_END)
+
+        except PipelineAbortedException:
+            pass
+
+        except BaseException as e:
+            self.exception = e
+            self._abort_event.set()
+
+
+class Pipeline:
+    """
+    Chain of a source and an arbitrary number of stages. The source is an
+    iterable of batches, every stage a function mapping an input batch to an
+    output batch. The result of the last stage is discarded, so the last stage
+    usually is the one writing the output.
+    """
+    def __init__(self, queue_size: int = 8):
+        self._queue_size = queue_size
+        self._abort_event = threading.Event()
+        self._stages = []
+        self._queues = []
+        self._queue_stats = []
+
+    def add_source(self, name: str, source: Iterable, count: Callable = len, unit: str = 'items'):
+        assert not self._stages, 'The source has to be the first stage'
+
+        self._stages.append(_Stage(
+            stats=StageStats(name, unit),
+            func=None,
+            count=count,
+            in_queue=None,
+            out_queue=None,
+            abort_event=self._abort_event,
+            source=source
+        ))
+
+    def add_stage(self, name: str, func: Callable, count: Callable = len, unit: str = 'items'):
+        assert self._stages, 'A source has to be added first'
+
+        previous_stage = self._stages[-1]
+        connecting_queue = queue.Queue(maxsize=self._queue_size)
+        previous_stage._out_queue = connecting_queue
+        self._queues.append(connecting_queue)
+        self._queue_stats.append(
+            QueueStats(f'{previous_stage.stats.name}->{name}', self._queue_size))
+
+        self._stages.append(_Stage(
+            stats=StageStats(name, unit),
+            func=func,
+            count=count,
+            in_queue=connecting_queue,
+            out_queue=None,
+            abort_event=self._abort_event
+        ))
+
+    def get_stage_stats(self) -> list:
+        return [stage.stats for stage in self._stages]
+
+    def get_queue_stats(self) -> list:
+        return self._queue_stats
+
+    def get_report(self) -> str:
+        lines = []
+        for stats in self.get_stage_stats():
+            lines.append(
+                f'stage {stats.name}: {stats.items} {stats.unit} in '
+                f'{stats.batches} batches, busy {stats.busy_seconds:.2f}s '
+                f'({stats.get_throughput():.0f} {stats.unit}/s), waited '
+                f'{stats.input_wait_seconds:.2f}s for input and '
+                f'{stats.output_wait_seconds:.2f}s for output')
+
+        for stats in self._queue_stats:
+            lines.append(
+                f'queue {stats.name}: mean occupancy '
+                f'{stats.get_mean_occupancy():.1f}/{stats.maxsize}, max '
+                f'{stats.max_occupancy}/{stats.maxsize}')
+
+        bottleneck = max(self.get_stage_stats(), key=lambda s: s.busy_seconds)
+        lines.append(f'bottleneck stage: {bottleneck.name}')
+
+        return '\n'.join(lines)
+
+    def run(self, sample_interval: float = 0.05, log_interval: float = 10.0):
+        for stage in self._stages:
+            stage.start()
+
+        last_log = time.perf_counter()
+        while any(stage.is_alive() for stage in self._stages):
+            for connecting_queue, stats in zip(self._queues, self._queue_stats):
+                stats.add_sample(connecting_queue.qsize())
+
+            if time.perf_counter() - last_log >= log_interval:
+                logger.info(self.get_report())
+                last_log = time.perf_counter()
+
+            self._stages[-1].join(timeout=sample_interval)
+
+        for stage in self._stages:
+            stage.join()
+
+        for stage in self._stages:
+            if stage.exception is not None:
+                raise stage.exception
+
+        logger.info(self.get_report())
@@ -7,10 +7,13 @@ from rdflib import URIRef, Graph
 
 from primekgtordf import vocab
 from primekgtordf.node import Node, NodesReader
+from primekgtordf.parquet import is_parquet_file, iter_parquet_rows
 
 
 logger = logging.getLogger(__name__)
 
+edge_columns = ['relation', 'display_relation', 'x_index', 'y_index']
+
 
 class RelationType(Enum):
     ProteinProteinInteraction = vocab.ppi_cls
@@ -142,23 +145,67 @@ class Relation:
     object_: Node
     relation_type: RelationType
 
+    def get_triple(self):
+        # TODO: Add reification with relation type
+        return self.subject.get_uri(), self.property, self.object_.get_uri()
+
+    def to_triples(self):
+        yield from self.subject.to_triples()
+        yield from self.object_.to_triples()
+        yield self.get_triple()
+
     def to_rdf(self):
         g = Graph()
+        for triple in self.to_triples():
+            g.add(triple)
 
-        g += self.subject.to_rdf()
-        g += self.object_.to_rdf()
-        g.add((self.subject.get_uri(), self.property, self.object_.get_uri()))
+        return g
 
-        # TODO: Add reification with relation type
 
-        return g
+def read_relation(
+        relation_type_str: str,
+        relation_type_abbrv: str,
+        subj_node_idx: str,
+        obj_node_idx: str,
+        nodes_reader: NodesReader
+) -> Relation:
+    """
+    Creates a Relation from the fields of one line of the PrimeKG edges CSV
+    file, e.g. 'protein_protein', 'ppi', '0', '8889'.
+    """
+    relation_type = RelationType.get_type_by_id(relation_type_str)
+    property_uri = vocab.get_property(relation_type_abbrv)
+
+    subj_node = nodes_reader.get_node_by_index(int(subj_node_idx))
+    obj_node = nodes_reader.get_node_by_index(int(obj_node_idx))
+
+    return Relation(
+        subject=subj_node,
+        property=property_uri,
+        object_=obj_node,
+        relation_type=relation_type
+    )
 
 
 class RelationsReader:
-    def __init__(self, relations_file_path: str, nodes_reader: NodesReader):
+    def __init__(self, relations_file_path: str, nodes_reader: NodesReader, subset_filter=None):
+        """
+        If a primekgtordf.subset.SubsetFilter is given, only the relations
+        selected by it are read.
+        """
         self._relations = []
         self._nodes_reader = nodes_reader
 
+        if subset_filter is not None:
+            for row, _ in subset_filter.iter_edge_records(relations_file_path):
+                self._relations.append(read_relation(*row, nodes_reader))
+            return
+
+        if is_parquet_file(relations_file_path):
+            for row, _ in iter_parquet_rows(relations_file_path, edge_columns):
+                self._relations.append(read_relation(*row, nodes_reader))
+            return
+
         with open(relations_file_path) as relations_file:
             csv_reader = csv.reader(relations_file, delimiter=',', quotechar='"')
             # relation,display_relation,x_index,y_index
@@ -177,17 +224,12 @@ class RelationsReader:
                 if csv_reader.line_num % 1000 == 0:
                     logger.info(f'read {csv_reader.line_num} lines')
 
-                relation_type = RelationType.get_type_by_id(relation_type_str)
-                property_uri = vocab.get_property(relation_type_abbrv)
-
-                subj_node = nodes_reader.get_node_by_index(int(subj_node_idx))
-                obj_node = nodes_reader.get_node_by_index(int(obj_node_idx))
-
-                relation = Relation(
-                    subject=subj_node,
-                    property=property_uri,
-                    object_=obj_node,
-                    relation_type=relation_type
+                relation = read_relation(
+                    relation_type_str,
+                    relation_type_abbrv,
+                    subj_node_idx,
+                    obj_node_idx,
+                    nodes_reader
                 )
 
                 self._relations.append(relation)
@@ -195,13 +237,22 @@ class RelationsReader:
     def get_relations(self):
         return self._relations
 
+    def get_node_indexes(self) -> set:
+        node_indexes = set()
+        for relation in self._relations:
+            node_indexes.add(relation.subject.node_index)
+            node_indexes.add(relation.object_.node_index)
+
+        return node_indexes
+
     def to_rdf(self):
         g = Graph()
 
         cntr = 0
         for relation in self._relations:
             cntr += 1
-            g += relation.to_rdf()
+            for triple in relation.to_triples():
+                g.add(triple)
             if cntr % 1000 == 0:
                 logger.info(
                     f'Generated RDF triples for {cntr} relations (and their '
@@ -0,0 +1,272 @@
+"""
+Small HTTP service serving the RDF description of single nodes on demand,
+e.g. for dereferencing node URIs like .../PrimeKG/node/<node ID>, without a
+full conversion and triple store. A node description consists of the node's
+own triples (types, name, source), all relations it takes part in and its
+disease/drug features. It is built lazily from on-disk offset indexes into
+the edges and feature files, and the serialized descriptions of recently
+requested nodes are kept in an LRU cache.
+"""
+import json
+import logging
+import os
+from argparse import ArgumentParser
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from rdflib import Graph
+
+from primekgtordf.csvfile import iter_csv_records, iter_csv_records_at
+from primekgtordf.disesefeatures import get_disease_features_triples
+from primekgtordf.drugfeatures import get_drug_features_triples
+from primekgtordf.node import NodesReader
+from primekgtordf.ntriples import to_ntriples
+from primekgtordf.relation import read_relation
+from primekgtordf.subset import EdgeIndex
+
+logger = logging.getLogger(__name__)
+
+_content_types = {
+    'turtle': 'text/turtle; charset=utf-8',
+    'nt': 'application/n-triples; charset=utf-8',
+}
+
+
+def get_feature_index_file_path(features_file_path: str) -> str:
+    return features_file_path + '.idx.json'
+
+
+class FeatureIndex:
+    """
+    Maps node indexes to the byte offsets of their records in a disease or
+    drug features file. Stored as JSON next to the features file, together
+    with the size and modification time of the features file.
+    """
+    def __init__(
+            self,
+            features_file_size: int,
+            features_file_mtime: int,
+            offsets_by_node: dict
+    ):
+        self.features_file_size = features_file_size
+        self.features_file_mtime = features_file_mtime
+        self._offsets_by_node = offsets_by_node
+
+    @classmethod
+    def build(cls, features_file_path: str):
+        # taken before reading, so changes while building make the index stale
+        stat = os.stat(features_file_path)
+        offsets_by_node = {}
+
+        start_offset = 0
+        for row, end_offset in iter_csv_records(features_file_path):
+            if row[0] not in ['node_index', '']:
+                offsets_by_node.setdefault(row[0], []).append(start_offset)
+            start_offset = end_offset
+
+        return cls(stat.st_size, stat.st_mtime_ns, offsets_by_node)
+
+    @classmethod
+    def get(cls, features_file_path: str):
+        """
+        Loads the index of the given features file, or builds and stores it
+        if there is none yet or it does not match the features file anymore.
+        """
+        index_file_path = get_feature_index_file_path(features_file_path)
+
+        if os.path.exists(index_file_path):
+            with open(index_file_path) as index_file:
+                index = cls(**json.load(index_file))
+            if index.matches(features_file_path):
+                return index
+
+            logger.info(f'Feature index {index_file_path} is stale. Rebuilding it')
+
+        logger.info(f'Building feature index {index_file_path}')
+        index = cls.build(features_file_path)
+        with open(index_file_path, 'w') as index_file:
+            json.dump({
+                'features_file_size': index.features_file_size,
+                'features_file_mtime': index.features_file_mtime,
+                'offsets_by_node': index._offsets_by_node,
+            }, index_file)
+
+        return index
+
+    def matches(self, features_file_path: str) -> bool:
+        """
+        Returns whether the index was built from the features file in its
+        current state.
+        """
+        stat = os.stat(features_file_path)
+
+        return self.features_file_size == stat.st_size \
+            and self.features_file_mtime == stat.st_mtime_ns
+
+    def get_offsets(self, node_index: int) -> list:
+        # JSON object keys are strings
+        return self._offsets_by_node.get(str(node_index), [])
+
+
+class NodeDescriber:
+    def __init__(
+            self,
+            nodes_reader: NodesReader,
+            edges_file_path: str,
+            disease_features_file_path: str = None,
+            drug_features_file_path: str = None,
+            cache_size: int = 10000
+    ):
+        self._nodes_reader = nodes_reader
+        self._edges_file_path = edges_file_path
+        self._edge_index = EdgeIndex.get(edges_file_path, nodes_reader.get_num_nodes())
+
+        self._features = []
+        if disease_features_file_path is not None:
+            self._features.append((
+                disease_features_file_path,
+                FeatureIndex.get(disease_features_file_path),
+                get_disease_features_triples
+            ))
+        if drug_features_file_path is not None:
+            self._features.append((
+                drug_features_file_path,
+                FeatureIndex.get(drug_features_file_path),
+                get_drug_features_triples
+            ))
+
+        # several nodes may share a node ID and hence the node URI
+        self._node_indexes_by_id = {}
+        for node in nodes_reader.get_nodes():
+            self._node_indexes_by_id.setdefault(node.node_id, []).append(node.node_index)
+
+        self.get_description = lru_cache(maxsize=cache_size)(self._get_description)
+
+    def get_triples(self, node_index: int) -> list:
+        node = self._nodes_reader.get_node_by_index(node_index)
+        triples = list(node.to_triples())
+
+        edge_offsets = sorted({
+            offset for _, _, offset in self._edge_index.get_entries(node_index)
+        })
+        for row, _ in iter_csv_records_at(self._edges_file_path, edge_offsets):
+            relation = read_relation(*row, self._nodes_reader)
+            triples.append(relation.get_triple())
+
+        for features_file_path, feature_index, get_feature_triples in self._features:
+            offsets = feature_index.get_offsets(node_index)
+            for row, _ in iter_csv_records_at(features_file_path, offsets):
+                triples.extend(get_feature_triples(row, self._nodes_reader))
+
+        return triples
+
+    def _get_description(self, node_id: str, rdf_format: str) -> bytes:
+        """
+        Returns the serialized description of the node(s) with the given node
+        ID, or None if there is no such node.
+        """
+        node_indexes = self._node_indexes_by_id.get(node_id)
+        if node_indexes is None:
+            return None
+
+        triples = []
+        for node_index in node_indexes:
+            triples.extend(self.get_triples(node_index))
+
+        if rdf_format == 'nt':
+            return to_ntriples(triples).encode('utf-8')
+
+        g = Graph()
+        for triple in triples:
+            g.add(triple)
+
+        return g.serialize(format=rdf_format, encoding='utf-8')
+
+
+def _get_requested_format(query: dict, accept_header: str) -> str:
+    if 'format' in query:
+        requested_format = query['format'][0]
+    elif 'application/n-triples' in accept_header:
+        requested_format = 'nt'
+    else:
+        requested_format = 'turtle'
+
+    if requested_format in ['ttl', 'turtle']:
+        return 'turtle'
+    elif requested_format in ['nt', 'ntriples']:
+        return 'nt'
+
+    return None
+
+
+def get_request_handler(node_describer: NodeDescriber):
+    class NodeRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            path_parts = url.path.rstrip('/').split('/')
+
+            if len(path_parts) < 2 or path_parts[-2] != 'node':
+                self.send_error(404)
+                return
+
+            rdf_format = _get_requested_format(
+                parse_qs(url.query), self.headers.get('Accept', ''))
+            if rdf_format is None:
+                self.send_error(406)
+                return
+
+            description = node_describer.get_description(
+                unquote(path_parts[-1]), rdf_format)
+            if description is None:
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', _content_types[rdf_format])
+            self.send_header('Content-Length', str(len(description)))
+            self.end_headers()
+            self.wfile.write(description)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return NodeRequestHandler
+
+
+def serve(node_describer: NodeDescriber, host: str = 'localhost', port: int = 8080):
+    server = ThreadingHTTPServer((host, port), get_request_handler(node_describer))
+    logger.info(f'Serving node descriptions on http://{host}:{port}/node/<node ID>')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    arg_parser = ArgumentParser()
+    arg_parser.add_argument('nodes_file')
+    arg_parser.add_argument('edges_file')
+    arg_parser.add_argument('--diseasefeatures')
+    arg_parser.add_argument('--drugfeatures')
+    arg_parser.add_argument('--host', default='localhost')
+    arg_parser.add_argument('--port', type=int, default=8080)
+    arg_parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=10000,
+        help='Number of serialized node descriptions to keep in memory'
+    )
+
+    args = arg_parser.parse_args()
+
+    serve(
+        NodeDescriber(
+            NodesReader(args.nodes_file),
+            args.edges_file,
+            args.diseasefeatures,
+            args.drugfeatures,
+            args.cache_size
+        ),
+        args.host,
+        args.port
+    )
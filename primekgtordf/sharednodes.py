@@ -0,0 +1,146 @@
+"""
+Read-only node table for worker processes. Instead of pickling the Node
+objects of a NodesReader into every worker, the node table (including the
+node URIs) is serialized once into a shared memory segment or a file, and
+workers attach to it without copying. Nodes are only materialized when they
+are looked up.
+
+Layout of the table:
+
+    header                  num_nodes, size of the string area
+    num_nodes records       node type code, node source code, offsets and
+                            lengths of node ID, node name and node URI in the
+                            string area; type code -1 marks a missing node
+    string area             UTF-8 encoded strings
+"""
+import mmap
+import struct
+from multiprocessing import shared_memory
+
+from rdflib import URIRef
+
+from primekgtordf.node import Node, NodesReader, NodeType, NodeSource
+
+_header = struct.Struct('<QQ')
+_record = struct.Struct('<bb2xIIIIII')
+
+_node_types = list(NodeType)
+_node_sources = list(NodeSource)
+
+
+def get_table_bytes(nodes_reader: NodesReader) -> bytes:
+    num_nodes = nodes_reader.get_num_nodes()
+    records = bytearray(_record.size * num_nodes)
+    strings = bytearray()
+
+    for i in range(num_nodes):
+        _record.pack_into(records, i * _record.size, -1, -1, 0, 0, 0, 0, 0, 0)
+
+    for node in nodes_reader.get_nodes():
+        fields = []
+        for value in [node.node_id, node.node_name, str(node.get_uri())]:
+            encoded = value.encode('utf-8')
+            fields += [len(strings), len(encoded)]
+            strings += encoded
+
+        _record.pack_into(
+            records,
+            node.node_index * _record.size,
+            _node_types.index(node.node_type),
+            _node_sources.index(node.node_source),
+            *fields
+        )
+
+    return _header.pack(num_nodes, len(strings)) + bytes(records) + bytes(strings)
+
+
+class SharedNodeTable:
+    """
+    Offers the lookup methods of NodesReader on top of a table in a shared
+    memory segment or memory-mapped file, so it can be used in its place.
+    """
+    def __init__(self, buffer, shared_memory_: shared_memory.SharedMemory = None, mmap_: mmap.mmap = None):
+        self._buffer = buffer
+        self._shared_memory = shared_memory_
+        self._mmap = mmap_
+
+        self._num_nodes, _ = _header.unpack_from(buffer, 0)
+        self._strings_start = _header.size + self._num_nodes * _record.size
+
+    @classmethod
+    def publish(cls, nodes_reader: NodesReader):
+        """
+        Creates a shared memory segment holding the node table. The
+        publishing process has to unlink() it when it is not needed anymore.
+        """
+        table_bytes = get_table_bytes(nodes_reader)
+        shm = shared_memory.SharedMemory(create=True, size=len(table_bytes))
+        shm.buf[:len(table_bytes)] = table_bytes
+
+        return cls(shm.buf, shared_memory_=shm)
+
+    @classmethod
+    def attach(cls, name: str):
+        shm = shared_memory.SharedMemory(name=name)
+
+        return cls(shm.buf, shared_memory_=shm)
+
+    @staticmethod
+    def write_file(nodes_reader: NodesReader, table_file_path: str):
+        with open(table_file_path, 'wb') as table_file:
+            table_file.write(get_table_bytes(nodes_reader))
+
+    @classmethod
+    def open_file(cls, table_file_path: str):
+        with open(table_file_path, 'rb') as table_file:
+            mmap_ = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(mmap_, mmap_=mmap_)
+
+    def get_name(self) -> str:
+        return self._shared_memory.name
+
+    def close(self):
+        # the buffer export of the shared memory has to be released first
+        self._buffer = None
+        if self._shared_memory is not None:
+            self._shared_memory.close()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def unlink(self):
+        self._shared_memory.unlink()
+
+    def _get_string(self, offset: int, length: int) -> str:
+        start = self._strings_start + offset
+        return bytes(self._buffer[start:start + length]).decode('utf-8')
+
+    def get_node_by_index(self, node_index: int) -> Node:
+        if not 0 <= node_index < self._num_nodes:
+            raise KeyError(node_index)
+
+        node_type_code, node_source_code, id_offset, id_length, \
+            name_offset, name_length, uri_offset, uri_length = \
+            _record.unpack_from(self._buffer, _header.size + node_index * _record.size)
+
+        if node_type_code == -1:
+            raise KeyError(node_index)
+
+        return Node(
+            node_index=node_index,
+            node_id=self._get_string(id_offset, id_length),
+            node_type=_node_types[node_type_code],
+            node_name=self._get_string(name_offset, name_length),
+            node_source=_node_sources[node_source_code],
+            uri=URIRef(self._get_string(uri_offset, uri_length))
+        )
+
+    def get_nodes(self):
+        for node_index in range(self._num_nodes):
+            try:
+                yield self.get_node_by_index(node_index)
+            except KeyError:
+                continue
+
+    def get_num_nodes(self) -> int:
+        return self._num_nodes
@@ -0,0 +1,167 @@
+"""
+Bounded-memory external merge sort of line-based (N-Triples) output files.
+Sorting the serialized triples gives a canonical output order, so that two
+conversions of the same release are byte-for-byte identical and two releases
+can be compared with a cheap streaming diff.
+
+Lines are read into memory until the memory budget is used up, sorted and
+spilled to a temporary run file. The runs are then merged in a k-way merge
+(in several passes if there are more runs than max_fan_in).
+"""
+import heapq
+import logging
+import os
+import tempfile
+from argparse import ArgumentParser
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+_default_memory_budget = 512 * 1024 * 1024
+_default_max_fan_in = 64
+_write_buffer_size = 1024 * 1024
+
+
+def _write_run(lines: list, tmp_dir_path: str) -> str:
+    lines.sort()
+    fd, run_file_path = tempfile.mkstemp(suffix='.run', dir=tmp_dir_path)
+    with os.fdopen(fd, 'wb', buffering=_write_buffer_size) as run_file:
+        run_file.writelines(lines)
+
+    return run_file_path
+
+
+def _split_into_runs(input_file_path: str, memory_budget: int, tmp_dir_path: str) -> list:
+    run_file_paths = []
+    lines = []
+    lines_size = 0
+
+    with open(input_file_path, 'rb') as input_file:
+        for line in input_file:
+            if not line.endswith(b'\n'):
+                # last line without line break
+                line += b'\n'
+
+            lines.append(line)
+            # the size of the bytes object plus the list entry
+            lines_size += len(line) + 41
+
+            if lines_size >= memory_budget:
+                run_file_paths.append(_write_run(lines, tmp_dir_path))
+                lines = []
+                lines_size = 0
+
+    if lines or not run_file_paths:
+        run_file_paths.append(_write_run(lines, tmp_dir_path))
+
+    return run_file_paths
+
+
+def _merge_runs(run_file_paths: list, output_file_path: str):
+    run_files = [open(path, 'rb') for path in run_file_paths]
+    try:
+        with open(output_file_path, 'wb', buffering=_write_buffer_size) as output_file:
+            output_file.writelines(heapq.merge(*run_files))
+    finally:
+        for run_file in run_files:
+            run_file.close()
+
+
+def sort_lines(
+        input_file_path: str,
+        output_file_path: str,
+        memory_budget: int = _default_memory_budget,
+        tmp_dir_path: str = None,
+        max_fan_in: int = _default_max_fan_in
+):
+    """
+    Sorts the lines of the input file byte-wise and writes them to the output
+    file, holding at most about memory_budget bytes of lines in memory. The
+    input and the output file may be the same.
+    """
+    if tmp_dir_path is None:
+        tmp_dir_path = os.path.dirname(os.path.abspath(output_file_path))
+
+    # all run files are created in a directory of their own, which is removed
+    # with whatever runs are left if sorting fails at any point
+    with tempfile.TemporaryDirectory(prefix='sort-', dir=tmp_dir_path) as runs_dir_path:
+        run_file_paths = _split_into_runs(input_file_path, memory_budget, runs_dir_path)
+        logger.info(f'Sorted {input_file_path} into {len(run_file_paths)} runs')
+
+        while len(run_file_paths) > max_fan_in:
+            merged_run_file_paths = []
+            runs = iter(run_file_paths)
+            while True:
+                group = list(islice(runs, max_fan_in))
+                if not group:
+                    break
+
+                fd, merged_run_file_path = tempfile.mkstemp(suffix='.run', dir=runs_dir_path)
+                os.close(fd)
+                _merge_runs(group, merged_run_file_path)
+                merged_run_file_paths.append(merged_run_file_path)
+
+                for run_file_path in group:
+                    os.remove(run_file_path)
+
+            run_file_paths = merged_run_file_paths
+
+        _merge_runs(run_file_paths, output_file_path)
+
+
+def diff_sorted(old_file_path: str, new_file_path: str):
+    """
+    Compares two sorted files in a single pass and yields ('-', line) for
+    lines only contained in the old file and ('+', line) for lines only
+    contained in the new file.
+    """
+    with open(old_file_path, 'rb') as old_file, open(new_file_path, 'rb') as new_file:
+        old_line = old_file.readline()
+        new_line = new_file.readline()
+
+        while old_line or new_line:
+            if not new_line or (old_line and old_line < new_line):
+                yield '-', old_line
+                old_line = old_file.readline()
+            elif not old_line or new_line < old_line:
+                yield '+', new_line
+                new_line = new_file.readline()
+            else:
+                old_line = old_file.readline()
+                new_line = new_file.readline()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    arg_parser = ArgumentParser()
+    sub_parsers = arg_parser.add_subparsers(dest='command', required=True)
+
+    sort_parser = sub_parsers.add_parser('sort', help='Sort an N-Triples file')
+    sort_parser.add_argument('input_file')
+    sort_parser.add_argument('output_file')
+    sort_parser.add_argument(
+        '--memory',
+        type=int,
+        default=_default_memory_budget // (1024 * 1024),
+        help='Memory budget in MB'
+    )
+    sort_parser.add_argument('--tmp-dir')
+
+    diff_parser = sub_parsers.add_parser(
+        'diff', help='Print the lines removed from/added to a sorted file')
+    diff_parser.add_argument('old_file')
+    diff_parser.add_argument('new_file')
+
+    args = arg_parser.parse_args()
+
+    if args.command == 'sort':
+        sort_lines(
+            args.input_file,
+            args.output_file,
+            args.memory * 1024 * 1024,
+            args.tmp_dir
+        )
+    else:
+        for sign, line in diff_sorted(args.old_file, args.new_file):
+            print(sign + ' ' + line.decode('utf-8'), end='')
@@ -0,0 +1,618 @@
+"""
+Streaming conversion of the PrimeKG CSV files to N-Triples. In contrast to
+the readers, which collect all triples of their input file in one rdflib
+Graph, rows are read and converted batch by batch and the resulting triples
+are written out right away.
+"""
+import dataclasses
+import logging
+import os
+from collections import Counter
+from enum import Enum
+from functools import partial
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+
+from primekgtordf import vocab
+from primekgtordf.checkpoint import Checkpoint, CheckpointingWriter, get_checkpoint_file_path
+from primekgtordf.csvfile import iter_csv_records
+from primekgtordf.dedup import Deduplicator
+from primekgtordf.disesefeatures import disease_feature_columns
+from primekgtordf.drugfeatures import drug_feature_columns
+from primekgtordf.features import ColumnSelection, log_num_malformed
+from primekgtordf.node import NodesReader
+from primekgtordf.ntriples import get_line, to_ntriples
+from primekgtordf.parquet import is_parquet_file
+from primekgtordf.pipeline import Pipeline
+from primekgtordf.relation import read_relation
+from primekgtordf.sharednodes import SharedNodeTable
+from primekgtordf.subset import SubsetFilter
+from primekgtordf.writers import FanOutWriter, UnknownOutputFormatException, get_writer, is_line_based, \
+    normalize_format
+
+logger = logging.getLogger(__name__)
+
+_header_first_fields = ['relation', 'node_index']
+
+
+class UnsupportedInputException(Exception):
+    pass
+
+
+class InputKind(Enum):
+    Vocab = 'vocab'
+    Edges = 'edges'
+    DiseaseFeatures = 'disease_features'
+    DrugFeatures = 'drug_features'
+
+
+@dataclasses.dataclass
+class Batch:
+    """
+    A batch of input rows on its way through the conversion pipeline. The
+    stages fill in the triples and the serialized data. end_offset is the byte
+    offset in the input file right after the last row of the batch.
+    """
+    input_kind: InputKind
+    rows: list
+    end_offset: int
+    triples: list = None
+    new_node_indexes: list = dataclasses.field(default_factory=list)
+    num_triples: int = 0
+    # lines removed by the de-duplication stage, if any
+    num_duplicates: int = 0
+    data: bytes = None
+    # result of the conversion in a worker process, if converted in parallel
+    pending: AsyncResult = None
+
+
+def _skip_header(records):
+    for row, end_offset in records:
+        if row[0] not in _header_first_fields:
+            yield row, end_offset
+        break
+
+    yield from records
+
+
+def iter_row_batches(
+        file_path: str,
+        batch_size: int,
+        start_offset: int = 0,
+        subset_filter: SubsetFilter = None
+):
+    """
+    Yields (rows, end_offset) tuples with up to batch_size rows each, starting
+    at the given byte offset of the file. If a SubsetFilter is given, only the
+    edge records selected by it are read.
+    """
+    if subset_filter is not None:
+        records = subset_filter.iter_edge_records(file_path, start_offset)
+    elif start_offset == 0:
+        records = _skip_header(iter_csv_records(file_path))
+    else:
+        records = iter_csv_records(file_path, start_offset)
+
+    batch = []
+    for row, end_offset in records:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch, end_offset
+            batch = []
+
+    if batch:
+        yield batch, end_offset
+
+
+def check_row_inputs(*file_paths: str):
+    """
+    Raises an UnsupportedInputException if any of the given input files (None
+    for absent ones) is a Parquet file, since the rows are read by byte offset.
+    """
+    for file_path in file_paths:
+        if file_path is not None and is_parquet_file(file_path):
+            raise UnsupportedInputException(
+                f'Parquet input {file_path} is not supported in streaming mode; '
+                f'convert it to CSV or use the non-streaming mode')
+
+
+def iter_input_batches(
+        edges_file_path: str,
+        disease_features_file_path: str = None,
+        drug_features_file_path: str = None,
+        batch_size: int = 10000,
+        input_offsets: dict = None,
+        subset_filter: SubsetFilter = None
+):
+    """
+    Returns an iterator of Batches for all inputs of a conversion in output
+    order. The vocabulary batch holds the vocabulary triples instead of rows.
+    If input_offsets (InputKind value -> byte offset) are given, e.g. from a
+    checkpoint, reading starts at these offsets. The SubsetFilter, if any, is
+    applied to the edges. Parquet inputs are rejected right away.
+    """
+    check_row_inputs(edges_file_path, disease_features_file_path, drug_features_file_path)
+
+    return _iter_input_batches(
+        edges_file_path,
+        disease_features_file_path,
+        drug_features_file_path,
+        batch_size,
+        input_offsets or {},
+        subset_filter
+    )
+
+
+def _iter_input_batches(
+        edges_file_path: str,
+        disease_features_file_path: str,
+        drug_features_file_path: str,
+        batch_size: int,
+        input_offsets: dict,
+        subset_filter: SubsetFilter
+):
+
+    if input_offsets.get(InputKind.Vocab.value, 0) == 0:
+        # sorted, since the iteration order of a Graph differs between runs
+        yield Batch(InputKind.Vocab, sorted(vocab.get_vocab_triples()), 1)
+
+    inputs = [
+        (InputKind.Edges, edges_file_path),
+        (InputKind.DiseaseFeatures, disease_features_file_path),
+        (InputKind.DrugFeatures, drug_features_file_path),
+    ]
+    for input_kind, file_path in inputs:
+        if file_path is None:
+            continue
+
+        start_offset = input_offsets.get(input_kind.value, 0)
+        batches = iter_row_batches(
+            file_path,
+            batch_size,
+            start_offset,
+            subset_filter if input_kind == InputKind.Edges else None
+        )
+        for rows, end_offset in batches:
+            yield Batch(input_kind, rows, end_offset)
+
+
+def get_feature_columns(
+        disease_columns: ColumnSelection = None,
+        drug_columns: ColumnSelection = None
+) -> dict:
+    """
+    Returns the ColumnSelections to convert by feature InputKind, defaulting
+    to the default columns of the disease and drug features.
+    """
+    return {
+        InputKind.DiseaseFeatures: disease_columns or disease_feature_columns,
+        InputKind.DrugFeatures: drug_columns or drug_feature_columns,
+    }
+
+
+class TripleConverter:
+    """
+    Converts (InputKind, rows) batches to lists of triples. The triples
+    describing a node are only generated for the first relation referencing
+    the node instead of once per relation. If features_of_seen_nodes_only is
+    set, e.g. when converting a subset, features are only converted for nodes
+    referenced by a relation. feature_columns are the ColumnSelections to
+    convert, as returned by get_feature_columns().
+    """
+    def __init__(
+            self,
+            nodes_reader: NodesReader,
+            seen_node_indexes: list = None,
+            features_of_seen_nodes_only: bool = False,
+            feature_columns: dict = None
+    ):
+        self._nodes_reader = nodes_reader
+        self._seen_node_indexes = set(seen_node_indexes or [])
+        self._features_of_seen_nodes_only = features_of_seen_nodes_only
+        self._feature_columns = feature_columns or get_feature_columns()
+        # malformed numeric feature values by column name
+        self.num_malformed = Counter()
+
+    def _get_relation_triples(self, rows: list, new_node_indexes: list) -> list:
+        triples = []
+        for relation_type_str, relation_type_abbrv, subj_node_idx, obj_node_idx in rows:
+            relation = read_relation(
+                relation_type_str,
+                relation_type_abbrv,
+                subj_node_idx,
+                obj_node_idx,
+                self._nodes_reader
+            )
+
+            for node in [relation.subject, relation.object_]:
+                if node.node_index not in self._seen_node_indexes:
+                    self._seen_node_indexes.add(node.node_index)
+                    new_node_indexes.append(node.node_index)
+                    triples.extend(node.to_triples())
+
+            triples.append(relation.get_triple())
+
+        return triples
+
+    def get_triples(self, input_kind: InputKind, rows: list, new_node_indexes: list) -> list:
+        if input_kind == InputKind.Vocab:
+            return rows
+        elif input_kind == InputKind.Edges:
+            return self._get_relation_triples(rows, new_node_indexes)
+        elif input_kind not in self._feature_columns:
+            raise NotImplementedError()
+
+        columns = self._feature_columns[input_kind]
+        triples = []
+        for row in rows:
+            if self._features_of_seen_nodes_only and \
+                    (row[0] == '' or int(row[0]) not in self._seen_node_indexes):
+                continue
+
+            triples.extend(
+                columns.get_triples(columns.project(row), self._nodes_reader, self.num_malformed))
+
+        return triples
+
+    def convert(self, batch: Batch) -> Batch:
+        batch.triples = self.get_triples(batch.input_kind, batch.rows, batch.new_node_indexes)
+        batch.num_triples = len(batch.triples)
+
+        return batch
+
+
+def _count_rows(batch: Batch) -> int:
+    return len(batch.rows)
+
+
+def _count_triples(batch: Batch) -> int:
+    return batch.num_triples
+
+
+def _count_bytes(batch: Batch) -> int:
+    return len(batch.data)
+
+
+def serialize(batch: Batch, keep_triples: bool = False) -> Batch:
+    batch.data = to_ntriples(batch.triples).encode('utf-8')
+    if not keep_triples:
+        batch.triples = None
+
+    return batch
+
+
+def iter_triples(
+        nodes,
+        edges: str,
+        disease_features: str = None,
+        drug_features: str = None,
+        batch_size: int = 10000,
+        as_ntriples: bool = False,
+        subset_filter: SubsetFilter = None
+):
+    """
+    Lazily converts the PrimeKG input files and yields the resulting triples
+    in batches, without writing any file or building a Graph. Each batch is a
+    list of (subject, predicate, object) rdflib term tuples, or, with
+    as_ntriples=True, a string of N-Triples lines.
+
+    nodes is either the path of the nodes CSV file or an already created
+    NodesReader (or SharedNodeTable). The other arguments are the paths of
+    the respective CSV files. Triples are yielded in the same order as in a
+    streaming conversion, i.e. vocabulary, relations (each node described
+    before its first relation), disease features and drug features.
+
+    Example:
+
+        import primekgtordf
+
+        for triples in primekgtordf.iter_triples('nodes.csv', 'edges.csv'):
+            for s, p, o in triples:
+                ...
+    """
+    if isinstance(nodes, str):
+        nodes = NodesReader(nodes)
+
+    converter = TripleConverter(
+        nodes,
+        features_of_seen_nodes_only=subset_filter is not None
+    )
+    batches = iter_input_batches(
+        edges,
+        disease_features,
+        drug_features,
+        batch_size,
+        subset_filter=subset_filter
+    )
+
+    for batch in batches:
+        triples = converter.convert(batch).triples
+        if not triples:
+            continue
+
+        if as_ntriples:
+            yield to_ntriples(triples)
+        else:
+            yield triples
+
+
+_worker_nodes_table = None
+_worker_feature_columns = None
+
+
+def _init_worker(nodes_table_name: str, feature_columns: dict):
+    global _worker_nodes_table, _worker_feature_columns
+    _worker_nodes_table = SharedNodeTable.attach(nodes_table_name)
+    _worker_feature_columns = feature_columns
+
+
+def _convert_rows_in_worker(input_kind: InputKind, rows: list) -> list:
+    """
+    Converts and serializes the rows of a batch in a worker process. Since
+    the workers do not know which nodes were already described, the node
+    triples are added later on by the ParallelAssembler. Returns a
+    (node indexes, N-Triples) tuple per row, holding the subject and object
+    node index for relations and the described node index for features, and
+    the counts of malformed feature values.
+    """
+    pieces = []
+    num_malformed = Counter()
+    if input_kind == InputKind.Edges:
+        for row in rows:
+            relation = read_relation(*row, _worker_nodes_table)
+            pieces.append((
+                (relation.subject.node_index, relation.object_.node_index),
+                get_line(relation.get_triple())
+            ))
+        return pieces, num_malformed
+
+    if input_kind not in _worker_feature_columns:
+        raise NotImplementedError()
+
+    columns = _worker_feature_columns[input_kind]
+    for row in rows:
+        if row[0] == '':
+            continue
+        pieces.append((
+            (int(row[0]),),
+            to_ntriples(columns.get_triples(columns.project(row), _worker_nodes_table, num_malformed))
+        ))
+
+    return pieces, num_malformed
+
+
+class ParallelAssembler:
+    """
+    Counterpart of the TripleConverter for batches converted in worker
+    processes: Collects the serialized rows of a batch in input order and
+    inserts the triples describing a node before the first relation
+    referencing it, which gives the same output as a sequential conversion.
+    """
+    def __init__(
+            self,
+            pool: Pool,
+            nodes_reader: NodesReader,
+            seen_node_indexes: list = None,
+            features_of_seen_nodes_only: bool = False
+    ):
+        self._pool = pool
+        self._nodes_reader = nodes_reader
+        self._seen_node_indexes = set(seen_node_indexes or [])
+        self._features_of_seen_nodes_only = features_of_seen_nodes_only
+        # malformed numeric feature values by column name
+        self.num_malformed = Counter()
+
+    def submit(self, batch: Batch) -> Batch:
+        if batch.input_kind != InputKind.Vocab:
+            batch.pending = self._pool.apply_async(
+                _convert_rows_in_worker, (batch.input_kind, batch.rows))
+
+        return batch
+
+    def assemble(self, batch: Batch) -> Batch:
+        if batch.input_kind == InputKind.Vocab:
+            batch.triples = batch.rows
+            batch.num_triples = len(batch.triples)
+            return serialize(batch)
+
+        pieces, num_malformed = batch.pending.get()
+        self.num_malformed.update(num_malformed)
+
+        parts = []
+        for node_indexes, ntriples in pieces:
+            if batch.input_kind == InputKind.Edges:
+                for node_index in node_indexes:
+                    if node_index not in self._seen_node_indexes:
+                        self._seen_node_indexes.add(node_index)
+                        batch.new_node_indexes.append(node_index)
+                        node = self._nodes_reader.get_node_by_index(node_index)
+                        parts.append(to_ntriples(node.to_triples()))
+
+            elif self._features_of_seen_nodes_only and \
+                    node_indexes[0] not in self._seen_node_indexes:
+                continue
+
+            parts.append(ntriples)
+
+        batch.pending = None
+        batch.data = ''.join(parts).encode('utf-8')
+        # literals are escaped in N-Triples, so there is one line per triple
+        batch.num_triples = batch.data.count(b'\n')
+
+        return batch
+
+
+def convert_streaming(
+        nodes_reader: NodesReader,
+        edges_file_path: str,
+        output_file_path: str,
+        disease_features_file_path: str = None,
+        drug_features_file_path: str = None,
+        batch_size: int = 10000,
+        queue_size: int = 8,
+        resume: bool = False,
+        checkpoint_interval: float = 60.0,
+        subset_filter: SubsetFilter = None,
+        workers: int = 1,
+        outputs: list = None,
+        deduplicator: Deduplicator = None,
+        disease_columns: ColumnSelection = None,
+        drug_columns: ColumnSelection = None
+) -> Pipeline:
+    """
+    Converts the PrimeKG input files to an N-Triples file with reading,
+    converting, serializing and writing running as separate pipeline stages.
+    Additional outputs can be given as (format, path) tuples, which are
+    written concurrently from the same batches.
+    Progress is committed to a checkpoint file next to the output file. With
+    resume=True an interrupted conversion continues from its last checkpoint,
+    provided the inputs, the outputs, the subset, the de-duplication and the
+    feature columns are unchanged.
+    With a SubsetFilter only the selected edges and the nodes and features
+    they reference are converted. With more than one worker, the rows are
+    converted in worker processes sharing the node table of the NodesReader
+    via shared memory. With a Deduplicator, lines already written are removed
+    before writing. ColumnSelections of the disease and drug features replace
+    the default columns to convert.
+    Returns the finished pipeline to give access to its statistics.
+    """
+    # the nodes file as well, since the output depends on the node table
+    input_file_paths = [
+        path for path in [
+            nodes_reader.nodes_file_path,
+            edges_file_path,
+            disease_features_file_path,
+            drug_features_file_path
+        ]
+        if path is not None
+    ]
+    checkpoint_file_path = get_checkpoint_file_path(output_file_path)
+    outputs = [('ntriples', output_file_path)] + [
+        (normalize_format(rdf_format), path) for rdf_format, path in outputs or []
+    ]
+    # checked before any output is opened, which would truncate it
+    check_row_inputs(edges_file_path, disease_features_file_path, drug_features_file_path)
+    if workers > 1 and not all(is_line_based(rdf_format) for rdf_format, _ in outputs):
+        raise UnknownOutputFormatException(
+            'Only line-based output formats can be written with several '
+            'workers')
+
+    feature_columns = get_feature_columns(disease_columns, drug_columns)
+    options = {
+        'outputs': [[rdf_format, path] for rdf_format, path in outputs],
+        'subset': subset_filter.get_options() if subset_filter is not None else None,
+        'dedup': deduplicator.get_options() if deduplicator is not None else None,
+        'feature_columns': {
+            input_kind.value: [column.name for column in columns.columns]
+            for input_kind, columns in feature_columns.items()
+        },
+    }
+
+    if resume and os.path.exists(checkpoint_file_path):
+        checkpoint = Checkpoint.load(checkpoint_file_path)
+        checkpoint.check_inputs(input_file_paths)
+        checkpoint.check_options(options)
+        logger.info(
+            f'Resuming from checkpoint at output sizes '
+            f'{checkpoint.output_sizes} ({checkpoint.counters})')
+        # the outputs are the checkpointed ones, so all their sizes are known
+        writers = [
+            get_writer(rdf_format, path, checkpoint.output_sizes[path])
+            for rdf_format, path in outputs
+        ]
+        if deduplicator is not None:
+            deduplicator.prime(output_file_path, checkpoint.output_sizes[output_file_path])
+    else:
+        if resume:
+            logger.info(f'No checkpoint {checkpoint_file_path} found. Starting from scratch')
+        checkpoint = Checkpoint.create(input_file_paths, options)
+        writers = [get_writer(rdf_format, path) for rdf_format, path in outputs]
+
+    fan_out_writer = FanOutWriter(writers, queue_size)
+
+    pipeline = Pipeline(queue_size=queue_size)
+
+    pipeline.add_source(
+        'read',
+        iter_input_batches(
+            edges_file_path,
+            disease_features_file_path,
+            drug_features_file_path,
+            batch_size,
+            checkpoint.input_offsets,
+            subset_filter
+        ),
+        count=_count_rows,
+        unit='rows'
+    )
+
+    nodes_table = None
+    pool = None
+    if workers > 1:
+        nodes_table = SharedNodeTable.publish(nodes_reader)
+        pool = Pool(
+            workers,
+            initializer=_init_worker,
+            initargs=(nodes_table.get_name(), feature_columns)
+        )
+        assembler = ParallelAssembler(
+            pool,
+            nodes_reader,
+            checkpoint.seen_node_indexes,
+            features_of_seen_nodes_only=subset_filter is not None
+        )
+        pipeline.add_stage('submit', assembler.submit, count=_count_rows, unit='rows')
+        pipeline.add_stage('convert', assembler.assemble, count=_count_rows, unit='rows')
+    else:
+        converter = TripleConverter(
+            nodes_reader,
+            checkpoint.seen_node_indexes,
+            features_of_seen_nodes_only=subset_filter is not None,
+            feature_columns=feature_columns
+        )
+        pipeline.add_stage('convert', converter.convert, count=_count_rows, unit='rows')
+        pipeline.add_stage(
+            'serialize',
+            partial(serialize, keep_triples=fan_out_writer.needs_triples()),
+            count=_count_triples,
+            unit='triples'
+        )
+
+    if deduplicator is not None:
+        pipeline.add_stage('dedup', deduplicator.dedup, count=_count_triples, unit='triples')
+
+    writer = CheckpointingWriter(
+        fan_out_writer,
+        checkpoint,
+        checkpoint_file_path,
+        checkpoint_interval
+    )
+    pipeline.add_stage('write', writer.write, count=_count_bytes, unit='bytes')
+
+    try:
+        pipeline.run()
+        writer.commit()
+    except BaseException:
+        fan_out_writer.abort()
+        raise
+    finally:
+        if pool is not None:
+            pool.terminate()
+            nodes_table.close()
+            nodes_table.unlink()
+
+    fan_out_writer.close()
+
+    num_malformed = assembler.num_malformed if workers > 1 else converter.num_malformed
+    log_num_malformed(num_malformed)
+
+    # the conversion is complete, so there is nothing to resume anymore
+    os.remove(checkpoint_file_path)
+
+    if deduplicator is not None:
+        logger.info(
+            f'Removed {checkpoint.counters.get("duplicates", 0)} duplicate '
+            f'triples (this run: {deduplicator.num_node_duplicates} node/vocab '
+            f'triples, {deduplicator.num_duplicates} relation/feature triples)')
+
+    return pipeline
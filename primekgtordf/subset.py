@@ -0,0 +1,403 @@
+"""
+Extraction of subsets of PrimeKG, restricted to certain relation types, node
+types and/or the k-hop neighborhood of a list of seed nodes. Rows of the edges
+file are filtered right after reading, before any conversion. Neighborhoods
+are expanded via an EdgeIndex over the edges file, so only the records of the
+selected edges have to be read at all. Parquet edge tables have no such
+index; there, each hop is one scan over the row groups whose statistics
+match the current frontier nodes.
+"""
+import array
+import json
+import logging
+import os
+
+from primekgtordf.csvfile import iter_csv_records, iter_csv_records_at
+from primekgtordf.node import NodesReader, NodeType
+from primekgtordf.parquet import is_parquet_file, iter_parquet_rows
+from primekgtordf.relation import RelationType, edge_columns
+
+logger = logging.getLogger(__name__)
+
+
+class StaleEdgeIndexException(Exception):
+    pass
+
+
+def get_edge_index_file_path(edges_file_path: str) -> str:
+    return edges_file_path + '.idx'
+
+
+class EdgeIndex:
+    """
+    Maps each node index to the edges it takes part in (as subject or
+    object). For every such edge the index holds the other node, the relation
+    type and the byte offset of the edge's record in the edges file. The
+    entries are stored in CSR layout, i.e. the entries of node i are at
+    positions indptr[i] to indptr[i+1]-1 of the entry arrays.
+
+    The index is stored next to the edges file as one JSON header line
+    followed by the binary entry arrays. The size and modification time of
+    the edges file are kept in the header to detect a stale index.
+    """
+    def __init__(
+            self,
+            edges_file_size: int,
+            edges_file_mtime: int,
+            relation_type_ids: list,
+            indptr: array.array,
+            neighbors: array.array,
+            relation_type_codes: array.array,
+            offsets: array.array
+    ):
+        self.edges_file_size = edges_file_size
+        self.edges_file_mtime = edges_file_mtime
+        self.relation_type_ids = relation_type_ids
+        self._indptr = indptr
+        self._neighbors = neighbors
+        self._relation_type_codes = relation_type_codes
+        self._offsets = offsets
+
+    @staticmethod
+    def _iter_edges(edges_file_path: str):
+        """
+        Yields (relation type, subject node index, object node index, record
+        offset) tuples for the edge records of the edges file.
+        """
+        start_offset = 0
+        for row, end_offset in iter_csv_records(edges_file_path):
+            relation_type_str, _, subj_node_idx, obj_node_idx = row
+
+            if relation_type_str == 'relation' and start_offset == 0:
+                # then we just read the header line
+                start_offset = end_offset
+                continue
+
+            yield relation_type_str, int(subj_node_idx), int(obj_node_idx), start_offset
+
+            start_offset = end_offset
+
+    @classmethod
+    def build(cls, edges_file_path: str, num_nodes: int):
+        """
+        Builds the index in two passes over the edges file, so only the entry
+        arrays themselves are held in memory: the first pass counts the
+        entries of each node, the second one fills the preallocated arrays.
+        """
+        # taken before reading, so changes while building make the index stale
+        stat = os.stat(edges_file_path)
+
+        degrees = array.array('q', bytes(8 * num_nodes))
+        for _, subj_node_idx, obj_node_idx, _ in cls._iter_edges(edges_file_path):
+            degrees[subj_node_idx] += 1
+            degrees[obj_node_idx] += 1
+
+        indptr = array.array('q', [0])
+        for degree in degrees:
+            indptr.append(indptr[-1] + degree)
+        num_entries = indptr[-1]
+
+        # next free position of each node's entries
+        cursors = array.array('q', indptr[:-1])
+        del degrees
+
+        neighbors = array.array('i', bytes(4 * num_entries))
+        relation_type_codes = array.array('b', bytes(num_entries))
+        offsets = array.array('q', bytes(8 * num_entries))
+        relation_type_codes_by_id = {}
+        for relation_type_str, subj_node_idx, obj_node_idx, offset in cls._iter_edges(edges_file_path):
+            relation_type_code = relation_type_codes_by_id.setdefault(
+                relation_type_str, len(relation_type_codes_by_id))
+
+            for node_index, neighbor in [(subj_node_idx, obj_node_idx), (obj_node_idx, subj_node_idx)]:
+                i = cursors[node_index]
+                neighbors[i] = neighbor
+                relation_type_codes[i] = relation_type_code
+                offsets[i] = offset
+                cursors[node_index] = i + 1
+
+        return cls(
+            stat.st_size,
+            stat.st_mtime_ns,
+            list(relation_type_codes_by_id),
+            indptr,
+            neighbors,
+            relation_type_codes,
+            offsets
+        )
+
+    @classmethod
+    def load(cls, index_file_path: str):
+        with open(index_file_path, 'rb') as index_file:
+            header = json.loads(index_file.readline())
+
+            indptr = array.array('q')
+            indptr.fromfile(index_file, header['num_nodes'] + 1)
+            num_entries = indptr[-1]
+
+            neighbors = array.array('i')
+            neighbors.fromfile(index_file, num_entries)
+            relation_type_codes = array.array('b')
+            relation_type_codes.fromfile(index_file, num_entries)
+            offsets = array.array('q')
+            offsets.fromfile(index_file, num_entries)
+
+        return cls(
+            header['edges_file_size'],
+            header['edges_file_mtime'],
+            header['relation_type_ids'],
+            indptr,
+            neighbors,
+            relation_type_codes,
+            offsets
+        )
+
+    @classmethod
+    def get(cls, edges_file_path: str, num_nodes: int):
+        """
+        Loads the index of the given edges file, or builds and stores it if
+        there is none yet or it does not match the edges file anymore.
+        """
+        index_file_path = get_edge_index_file_path(edges_file_path)
+
+        if os.path.exists(index_file_path):
+            index = cls.load(index_file_path)
+            if index.matches(edges_file_path) and index.get_num_nodes() >= num_nodes:
+                return index
+
+            logger.info(f'Edge index {index_file_path} is stale. Rebuilding it')
+
+        logger.info(f'Building edge index {index_file_path}')
+        index = cls.build(edges_file_path, num_nodes)
+        index.save(index_file_path)
+
+        return index
+
+    def matches(self, edges_file_path: str) -> bool:
+        """
+        Returns whether the index was built from the edges file in its
+        current state.
+        """
+        stat = os.stat(edges_file_path)
+
+        return self.edges_file_size == stat.st_size \
+            and self.edges_file_mtime == stat.st_mtime_ns
+
+    def save(self, index_file_path: str):
+        header = {
+            'edges_file_size': self.edges_file_size,
+            'edges_file_mtime': self.edges_file_mtime,
+            'num_nodes': self.get_num_nodes(),
+            'relation_type_ids': self.relation_type_ids,
+        }
+        with open(index_file_path, 'wb') as index_file:
+            index_file.write(json.dumps(header).encode('utf-8') + b'\n')
+            self._indptr.tofile(index_file)
+            self._neighbors.tofile(index_file)
+            self._relation_type_codes.tofile(index_file)
+            self._offsets.tofile(index_file)
+
+    def get_num_nodes(self) -> int:
+        return len(self._indptr) - 1
+
+    def get_entries(self, node_index: int):
+        """
+        Yields (neighbor node index, relation type id, record offset) tuples
+        for all edges of the given node.
+        """
+        if node_index >= self.get_num_nodes():
+            return
+
+        for i in range(self._indptr[node_index], self._indptr[node_index + 1]):
+            yield self._neighbors[i], \
+                self.relation_type_ids[self._relation_type_codes[i]], \
+                self._offsets[i]
+
+
+class SubsetFilter:
+    """
+    Selects the edges to convert. Without seed nodes all edges of the given
+    relation types between nodes of the given node types are selected (no
+    restriction if None). With seed nodes only those edges are selected which
+    are reached when expanding the neighborhood of the seed nodes hops times
+    along edges matching the relation and node types.
+    """
+    def __init__(
+            self,
+            nodes_reader: NodesReader,
+            relation_types: list = None,
+            node_types: list = None,
+            seed_node_indexes: list = None,
+            hops: int = 1
+    ):
+        self._nodes_reader = nodes_reader
+
+        self._relation_types = None
+        if relation_types is not None:
+            # raises an exception for unknown relation types
+            for relation_type_str in relation_types:
+                RelationType.get_type_by_id(relation_type_str)
+            self._relation_types = set(relation_types)
+
+        self._node_type_ids = node_types
+        self._node_types = None
+        if node_types is not None:
+            self._node_types = {
+                NodeType.get_type_by_id(node_type_str)
+                for node_type_str in node_types
+            }
+
+        self._seed_node_indexes = seed_node_indexes
+        self._hops = hops
+
+    def get_options(self) -> dict:
+        """
+        Returns the options selecting the subset as JSON-serializable dict,
+        e.g. to check that a resumed conversion selects the same subset.
+        """
+        relation_types = None
+        if self._relation_types is not None:
+            relation_types = sorted(self._relation_types)
+
+        node_types = None
+        if self._node_type_ids is not None:
+            node_types = sorted(set(self._node_type_ids))
+
+        return {
+            'relation_types': relation_types,
+            'node_types': node_types,
+            'seed_node_indexes': self._seed_node_indexes,
+            'hops': self._hops if self._seed_node_indexes is not None else None,
+        }
+
+    def accepts_edge(self, relation_type_str: str, subj_node_idx: int, obj_node_idx: int) -> bool:
+        if self._relation_types is not None \
+                and relation_type_str not in self._relation_types:
+            return False
+
+        if self._node_types is not None:
+            for node_index in [subj_node_idx, obj_node_idx]:
+                node = self._nodes_reader.get_node_by_index(node_index)
+                if node.node_type not in self._node_types:
+                    return False
+
+        return True
+
+    def accepts_edge_row(self, row: list) -> bool:
+        relation_type_str, _, subj_node_idx, obj_node_idx = row
+
+        return self.accepts_edge(
+            relation_type_str, int(subj_node_idx), int(obj_node_idx))
+
+    def get_neighborhood_edge_offsets(self, edge_index: EdgeIndex) -> list:
+        """
+        Expands the neighborhood of the seed nodes and returns the sorted
+        record offsets of all edges traversed.
+        """
+        selected_node_indexes = set(self._seed_node_indexes)
+        frontier = set(self._seed_node_indexes)
+        edge_offsets = set()
+
+        for _ in range(self._hops):
+            next_frontier = set()
+            for node_index in frontier:
+                for neighbor, relation_type_str, offset in edge_index.get_entries(node_index):
+                    if not self.accepts_edge(relation_type_str, node_index, neighbor):
+                        continue
+
+                    edge_offsets.add(offset)
+                    if neighbor not in selected_node_indexes:
+                        selected_node_indexes.add(neighbor)
+                        next_frontier.add(neighbor)
+
+            frontier = next_frontier
+
+        logger.info(
+            f'{self._hops}-hop neighborhood of {len(self._seed_node_indexes)} '
+            f'seed nodes has {len(selected_node_indexes)} nodes and '
+            f'{len(edge_offsets)} edges')
+
+        return sorted(edge_offsets)
+
+    def _get_relation_type_filters(self) -> list:
+        if self._relation_types is None:
+            return []
+
+        return [(['relation'], self._relation_types)]
+
+    def iter_parquet_neighborhood_edge_rows(self, edges_file_path: str):
+        """
+        Expands the neighborhood of the seed nodes in a Parquet edges file and
+        yields (row, row_number) tuples for all edges traversed, in file
+        order.
+        """
+        selected_node_indexes = set(self._seed_node_indexes)
+        frontier = set(self._seed_node_indexes)
+        edge_rows = {}
+
+        for _ in range(self._hops):
+            next_frontier = set()
+            value_filters = self._get_relation_type_filters() + \
+                [(['x_index', 'y_index'], frontier)]
+            rows = iter_parquet_rows(edges_file_path, edge_columns, value_filters)
+            for row, row_number in rows:
+                subj_node_idx, obj_node_idx = int(row[2]), int(row[3])
+                if subj_node_idx not in frontier and obj_node_idx not in frontier:
+                    continue
+                if not self.accepts_edge(row[0], subj_node_idx, obj_node_idx):
+                    continue
+
+                edge_rows[row_number] = row
+                for node_index in [subj_node_idx, obj_node_idx]:
+                    if node_index not in selected_node_indexes:
+                        selected_node_indexes.add(node_index)
+                        next_frontier.add(node_index)
+
+            frontier = next_frontier
+
+        logger.info(
+            f'{self._hops}-hop neighborhood of {len(self._seed_node_indexes)} '
+            f'seed nodes has {len(selected_node_indexes)} nodes and '
+            f'{len(edge_rows)} edges')
+
+        for row_number in sorted(edge_rows):
+            yield edge_rows[row_number], row_number
+
+    def iter_edge_records(self, edges_file_path: str, start_offset: int = 0):
+        """
+        Yields (row, end_offset) tuples for the selected records of the edges
+        file, starting at the given byte offset. The header line is skipped.
+        For Parquet edges files, (row, row_number) tuples are yielded and
+        reading always starts at the first row.
+        """
+        if is_parquet_file(edges_file_path):
+            if self._seed_node_indexes is not None:
+                yield from self.iter_parquet_neighborhood_edge_rows(edges_file_path)
+                return
+
+            rows = iter_parquet_rows(
+                edges_file_path, edge_columns, self._get_relation_type_filters())
+            for row, row_number in rows:
+                if self.accepts_edge_row(row):
+                    yield row, row_number
+            return
+
+        if self._seed_node_indexes is not None:
+            edge_index = EdgeIndex.get(edges_file_path, self._nodes_reader.get_num_nodes())
+            offsets = [
+                offset for offset in self.get_neighborhood_edge_offsets(edge_index)
+                if offset >= start_offset
+            ]
+            yield from iter_csv_records_at(edges_file_path, offsets)
+            return
+
+        is_first_record = start_offset == 0
+        for row, end_offset in iter_csv_records(edges_file_path, start_offset):
+            if is_first_record and row[0] == 'relation':
+                # then we just read the header line
+                is_first_record = False
+                continue
+            is_first_record = False
+
+            if self.accepts_edge_row(row):
+                yield row, end_offset
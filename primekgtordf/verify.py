@@ -0,0 +1,273 @@
+"""
+Verification of conversion outputs against the manifest written next to the
+main output file (<output>.manifest.json). The manifest records size, SHA-256
+checksum and number of triples of each output file.
+
+Verifying checks the sizes and checksums and parses every output file. The
+line-based outputs (N-Triples, N-Quads and the Turtle written as N-Triples
+lines by streaming conversions) are split into newline-aligned chunks which
+are parsed in parallel processes, so the first syntax errors can be reported
+with their byte offsets. All other outputs are parsed as a whole with rdflib.
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+from argparse import ArgumentParser
+from multiprocessing import Pool
+
+from rdflib import Dataset, Graph
+from rdflib.plugins.parsers.nquads import NQuadsParser
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser, ParseError
+
+logger = logging.getLogger(__name__)
+
+_read_buffer_size = 1024 * 1024
+
+_nquads_formats = ['nq', 'nquads']
+_quad_formats = _nquads_formats + ['trig', 'trix']
+
+
+def get_manifest_file_path(output_file_path: str) -> str:
+    return output_file_path + '.manifest.json'
+
+
+def _get_checksum(file_path: str) -> tuple:
+    """
+    Returns the SHA-256 hex digest and the number of lines of a file.
+    """
+    checksum = hashlib.sha256()
+    num_lines = 0
+    with open(file_path, 'rb') as file:
+        while True:
+            data = file.read(_read_buffer_size)
+            if not data:
+                break
+            checksum.update(data)
+            num_lines += data.count(b'\n')
+
+    return checksum.hexdigest(), num_lines
+
+
+def write_manifest(
+        manifest_file_path: str,
+        outputs: list,
+        num_triples: int = None
+):
+    """
+    Writes the manifest of the given (format, path, line-based) outputs. For
+    line-based outputs the number of triples is the number of lines, for all
+    others num_triples is recorded, if known.
+    """
+    manifest_dir_path = os.path.dirname(os.path.abspath(manifest_file_path))
+
+    files = []
+    for rdf_format, output_file_path, line_based in outputs:
+        checksum, num_lines = _get_checksum(output_file_path)
+        files.append({
+            'path': os.path.relpath(os.path.abspath(output_file_path), manifest_dir_path),
+            'format': rdf_format,
+            'line_based': line_based,
+            'size': os.path.getsize(output_file_path),
+            'sha256': checksum,
+            'triples': num_lines if line_based else num_triples,
+        })
+
+    with open(manifest_file_path, 'w') as manifest_file:
+        json.dump({'files': files}, manifest_file, indent=2)
+
+
+def get_chunks(file_path: str, chunk_size: int) -> list:
+    """
+    Splits a file into (start, end) byte ranges of about chunk_size bytes,
+    each ending right after a line break (or at the end of the file).
+    """
+    size = os.path.getsize(file_path)
+
+    chunks = []
+    start = 0
+    with open(file_path, 'rb') as file:
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            file.readline()
+            end = min(file.tell(), size)
+            chunks.append((start, end))
+            start = end
+
+    return chunks
+
+
+class _CountingSink:
+    """
+    Sink of the N-Triples and N-Quads parsers which only counts the triples.
+    """
+    identifier = None
+
+    def __init__(self):
+        self.num_triples = 0
+
+    def triple(self, s, p, o):
+        self.num_triples += 1
+
+    def get_context(self, context):
+        return self
+
+    def add(self, triple):
+        self.num_triples += 1
+
+
+def _parse_chunk(
+        file_path: str,
+        rdf_format: str,
+        start: int,
+        end: int,
+        max_errors: int
+) -> tuple:
+    """
+    Parses the lines in the given byte range of an N-Triples or N-Quads file
+    and returns the number of triples and up to max_errors (byte offset,
+    message) tuples of syntax errors.
+    """
+    sink = _CountingSink()
+    if rdf_format in _nquads_formats:
+        parser = NQuadsParser(sink=sink)
+    else:
+        parser = W3CNTriplesParser(sink=sink)
+
+    errors = []
+    offset = start
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        while offset < end:
+            line = file.readline()
+            line_offset = offset
+            offset += len(line)
+
+            try:
+                parser.line = line.decode('utf-8').rstrip('\r\n')
+                parser.parseline()
+            except (ParseError, UnicodeDecodeError) as e:
+                if len(errors) < max_errors:
+                    errors.append((line_offset, f'{e} in line {line[:200]!r}'))
+
+    return sink.num_triples, errors
+
+
+def _parse_file(file_path: str, rdf_format: str) -> tuple:
+    """
+    Parses a whole file with rdflib and returns the number of triples and the
+    syntax error, if any.
+    """
+    g = Dataset(default_union=True) if rdf_format in _quad_formats else Graph()
+    try:
+        g.parse(file_path, format=rdf_format)
+        return len(g), []
+    except Exception as e:
+        return 0, [(None, str(e))]
+
+
+def verify(
+        manifest_file_path: str,
+        workers: int = os.cpu_count(),
+        chunk_size: int = 64 * 1024 * 1024,
+        max_errors: int = 10
+) -> bool:
+    """
+    Verifies all output files of a manifest and logs the findings. Returns
+    whether all files are complete and parseable.
+    """
+    with open(manifest_file_path) as manifest_file:
+        manifest = json.load(manifest_file)
+    manifest_dir_path = os.path.dirname(os.path.abspath(manifest_file_path))
+
+    is_valid = True
+    with Pool(workers) as pool:
+        pending = []
+        for entry in manifest['files']:
+            file_path = os.path.join(manifest_dir_path, entry['path'])
+            if not os.path.exists(file_path):
+                logger.error(f'{file_path}: missing')
+                is_valid = False
+                continue
+
+            checksum = pool.apply_async(_get_checksum, (file_path,))
+            if entry['line_based']:
+                parse_results = [
+                    pool.apply_async(
+                        _parse_chunk,
+                        (file_path, entry['format'], start, end, max_errors))
+                    for start, end in get_chunks(file_path, chunk_size)
+                ]
+            else:
+                parse_results = [
+                    pool.apply_async(_parse_file, (file_path, entry['format']))
+                ]
+            pending.append((entry, file_path, checksum, parse_results))
+
+        for entry, file_path, checksum, parse_results in pending:
+            problems = []
+
+            size = os.path.getsize(file_path)
+            if size != entry['size']:
+                problems.append(f'size {size} instead of {entry["size"]}')
+
+            if checksum.get()[0] != entry['sha256']:
+                problems.append('checksum mismatch')
+
+            num_triples = 0
+            errors = []
+            for parse_result in parse_results:
+                chunk_num_triples, chunk_errors = parse_result.get()
+                num_triples += chunk_num_triples
+                errors.extend(chunk_errors)
+
+            if entry['triples'] is not None and num_triples != entry['triples']:
+                problems.append(f'{num_triples} triples instead of {entry["triples"]}')
+
+            if errors:
+                problems.append('syntax errors')
+
+            if not problems:
+                logger.info(f'{file_path}: OK ({num_triples} triples)')
+                continue
+
+            is_valid = False
+            logger.error(f'{file_path}: {", ".join(problems)}')
+            for offset, message in errors[:max_errors]:
+                if offset is None:
+                    logger.error(f'  {message}')
+                else:
+                    logger.error(f'  at byte offset {offset}: {message}')
+
+    return is_valid
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    arg_parser = ArgumentParser()
+    arg_parser.add_argument('manifest_file', help='<output>.manifest.json of a conversion')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count())
+    arg_parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=64,
+        help='Size of the chunks of line-based files parsed in parallel in MB'
+    )
+    arg_parser.add_argument(
+        '--max-errors',
+        type=int,
+        default=10,
+        help='Maximum number of syntax errors reported per file'
+    )
+
+    args = arg_parser.parse_args()
+
+    valid = verify(
+        args.manifest_file,
+        args.workers,
+        args.chunk_size * 1024 * 1024,
+        args.max_errors
+    )
+    sys.exit(0 if valid else 1)
@@ -113,6 +113,10 @@ has_orphanet_clinical_description = URIRef(
 )
 
 has_drug_description = URIRef(PRIMEKG_URI_PREFIX + 'vocab/has_drug_description')
+has_molecular_weight = URIRef(PRIMEKG_URI_PREFIX + 'vocab/has_molecular_weight')
+has_tpsa = URIRef(PRIMEKG_URI_PREFIX + 'vocab/has_tpsa')
+has_clogp = URIRef(PRIMEKG_URI_PREFIX + 'vocab/has_clogp')
+has_half_life_seconds = URIRef(PRIMEKG_URI_PREFIX + 'vocab/has_half_life_seconds')
 
 
 class UnknownVocabularyElementException(Exception):
@@ -141,6 +145,13 @@ _known_property_abbreviations = [
 ]
 
 
+def get_property_abbreviations() -> list:
+    """
+    Returns the abbreviations of all relation properties, e.g. 'ppi'.
+    """
+    return list(_known_property_abbreviations)
+
+
 def get_property(property_abbrv_str: str):
     if property_abbrv_str not in _known_property_abbreviations:
         raise UnknownVocabularyElementException()
@@ -233,6 +244,11 @@ def get_vocab_triples():
     g.add((has_drug_description, RDFS.domain, node_cls))
     g.add((has_drug_description, RDFS.range, XSD.string))
 
+    for numeric_drug_property in [has_molecular_weight, has_tpsa, has_clogp, has_half_life_seconds]:
+        g.add((numeric_drug_property, RDF.type, OWL.DatatypeProperty))
+        g.add((numeric_drug_property, RDFS.domain, node_cls))
+        g.add((numeric_drug_property, RDFS.range, XSD.decimal))
+
     for prop_abbrv_str in _known_property_abbreviations:
         prop = get_property(prop_abbrv_str)
         g.add((prop, RDF.type, OWL.ObjectProperty))
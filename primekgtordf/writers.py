@@ -0,0 +1,304 @@
+"""
+Output writers of streaming conversions. A FanOutWriter hands every batch to
+several writers, e.g. to produce Turtle, N-Triples and N-Quads in one run.
+Each writer runs in its own thread with a bounded queue, so the writers work
+concurrently and the slowest one sets the pace.
+
+The batches arrive serialized as N-Triples, which is a subset of Turtle, and
+N-Quads lines only differ by the added graph term. So the line-based formats
+share the serialization done once in the pipeline. All other formats
+supported by rdflib are collected in a Graph and serialized at the end.
+
+Quad formats (N-Quads, TriG, TriX) hold all triples in the named graph
+<https://zitniklab.hms.harvard.edu/projects/PrimeKG/>, with and without
+streaming.
+"""
+import logging
+import os
+import queue
+import threading
+from itertools import islice
+
+from rdflib import Dataset, Graph, URIRef
+from rdflib.plugin import PluginException, get as get_plugin
+from rdflib.serializer import Serializer
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.ntriples import to_ntriples
+
+logger = logging.getLogger(__name__)
+
+_write_buffer_size = 1024 * 1024
+# triples serialized at once when writing a Graph line by line
+_write_batch_size = 10000
+
+# short names and their rdflib serializer names
+_format_aliases = {
+    'nt': 'ntriples',
+    'nt11': 'ntriples',
+    'nq': 'nquads',
+    'ttl': 'turtle',
+}
+_quad_formats = ['nquads', 'trig', 'trix']
+
+graph_name = URIRef(PRIMEKG_URI_PREFIX)
+
+_END = object()
+
+
+class UnknownOutputFormatException(Exception):
+    pass
+
+
+def normalize_format(rdf_format: str) -> str:
+    """
+    Returns the rdflib serializer name of a format, e.g. 'nquads' for 'nq'.
+    """
+    rdf_format = _format_aliases.get(rdf_format, rdf_format)
+
+    try:
+        get_plugin(rdf_format, Serializer)
+    except PluginException:
+        raise UnknownOutputFormatException(f'Unknown output format {rdf_format}')
+
+    return rdf_format
+
+
+def parse_output_target(output_target: str) -> tuple:
+    """
+    Parses an output target of the form <format>:<path>, e.g. nt:out.nt,
+    and returns the (normalized format, path) tuple.
+    """
+    if ':' not in output_target:
+        raise UnknownOutputFormatException(
+            f'Output target {output_target} is not of the form format:path')
+
+    rdf_format, output_file_path = output_target.split(':', 1)
+
+    return normalize_format(rdf_format), output_file_path
+
+
+def is_quad_format(rdf_format: str) -> bool:
+    """
+    Checks whether a (normalized) format holds named graphs.
+    """
+    return rdf_format in _quad_formats
+
+
+def is_line_based(rdf_format: str, streaming: bool = True) -> bool:
+    """
+    Checks whether outputs of a (normalized) format are written one triple
+    per line. Turtle is only written as N-Triples lines by streaming
+    conversions.
+    """
+    if rdf_format == 'turtle':
+        return streaming
+
+    return rdf_format in ['ntriples', 'nquads']
+
+
+class LinesWriter:
+    """
+    Writes N-Triples, Turtle or N-Quads. If resume_size is given, an existing
+    output file is truncated to this size and appended to.
+    """
+    def __init__(self, rdf_format: str, output_file_path: str, resume_size: int = None):
+        self.output_file_path = output_file_path
+        self.needs_triples = False
+
+        self._line_end = None
+        if rdf_format == 'nquads':
+            self._line_end = b' ' + graph_name.n3().encode('utf-8') + b' .\n'
+
+        if resume_size is None:
+            self._output_file = open(output_file_path, 'wb', buffering=_write_buffer_size)
+        else:
+            self._output_file = open(output_file_path, 'r+b', buffering=_write_buffer_size)
+            self._output_file.truncate(resume_size)
+            self._output_file.seek(resume_size)
+
+    def write(self, batch):
+        self.write_lines(batch.data)
+
+    def write_lines(self, data: bytes):
+        if self._line_end is not None:
+            data = data.replace(b' .\n', self._line_end)
+
+        self._output_file.write(data)
+
+    def sync(self) -> int:
+        """
+        Makes sure everything written so far is on disk and returns the size
+        of the output.
+        """
+        self._output_file.flush()
+        os.fsync(self._output_file.fileno())
+
+        return self._output_file.tell()
+
+    def close(self):
+        self._output_file.close()
+
+    def abort(self):
+        self._output_file.close()
+
+
+class GraphWriter:
+    """
+    Writes any format supported by rdflib. Since these formats cannot be
+    written incrementally, all triples are kept in a Graph until close().
+    """
+    def __init__(self, rdf_format: str, output_file_path: str):
+        self.output_file_path = output_file_path
+        self.needs_triples = True
+        self._rdf_format = rdf_format
+        self._g = Graph()
+
+    def write(self, batch):
+        for triple in batch.triples:
+            self._g.add(triple)
+
+    def sync(self) -> int:
+        return 0
+
+    def close(self):
+        write_graph(self._g, self._rdf_format, self.output_file_path)
+
+    def abort(self):
+        self._g = None
+
+
+def write_graph(g: Graph, rdf_format: str, output_file_path: str):
+    """
+    Writes all triples of a Graph in the given (normalized) format. N-Triples
+    and N-Quads are written like in a streaming conversion.
+    """
+    if is_line_based(rdf_format, streaming=False):
+        writer = LinesWriter(rdf_format, output_file_path)
+        triples = iter(g)
+        while True:
+            batch = list(islice(triples, _write_batch_size))
+            if not batch:
+                break
+            writer.write_lines(to_ntriples(batch).encode('utf-8'))
+        writer.close()
+        return
+
+    if is_quad_format(rdf_format):
+        dataset = Dataset()
+        named_graph = dataset.graph(graph_name)
+        named_graph += g
+        dataset.serialize(destination=output_file_path, format=rdf_format)
+        return
+
+    g.serialize(destination=output_file_path, format=rdf_format)
+
+
+def get_writer(rdf_format: str, output_file_path: str, resume_size: int = None):
+    if is_line_based(rdf_format):
+        return LinesWriter(rdf_format, output_file_path, resume_size)
+
+    if resume_size is not None:
+        raise UnknownOutputFormatException(
+            f'Output format {rdf_format} cannot be resumed')
+
+    return GraphWriter(rdf_format, output_file_path)
+
+
+class _Sync:
+    def __init__(self):
+        self.done = threading.Event()
+        self.size = 0
+
+
+class _WriterThread(threading.Thread):
+    def __init__(self, writer, queue_size: int):
+        super().__init__(name='write ' + writer.output_file_path, daemon=True)
+        self.writer = writer
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.exception = None
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is _END:
+                break
+
+            if self.exception is not None:
+                # keep on consuming to not block the producer
+                if isinstance(item, _Sync):
+                    item.done.set()
+                continue
+
+            try:
+                if isinstance(item, _Sync):
+                    item.size = self.writer.sync()
+                    item.done.set()
+                else:
+                    self.writer.write(item)
+            except BaseException as e:
+                self.exception = e
+                if isinstance(item, _Sync):
+                    item.done.set()
+
+
+class FanOutWriter:
+    def __init__(self, writers: list, queue_size: int = 8):
+        self._threads = [_WriterThread(writer, queue_size) for writer in writers]
+        for thread in self._threads:
+            thread.start()
+
+    def needs_triples(self) -> bool:
+        return any(thread.writer.needs_triples for thread in self._threads)
+
+    def _raise_writer_exception(self):
+        for thread in self._threads:
+            if thread.exception is not None:
+                raise thread.exception
+
+    def write(self, batch):
+        self._raise_writer_exception()
+        for thread in self._threads:
+            thread.queue.put(batch)
+
+    def sync(self) -> dict:
+        """
+        Waits until all writers have written the batches handed over so far
+        to disk and returns the sizes of the outputs by output file path.
+        """
+        syncs = []
+        for thread in self._threads:
+            sync = _Sync()
+            thread.queue.put(sync)
+            syncs.append(sync)
+
+        for sync in syncs:
+            sync.done.wait()
+        self._raise_writer_exception()
+
+        return {
+            thread.writer.output_file_path: sync.size
+            for thread, sync in zip(self._threads, syncs)
+        }
+
+    def _stop_threads(self):
+        for thread in self._threads:
+            thread.queue.put(_END)
+        for thread in self._threads:
+            thread.join()
+
+    def close(self):
+        self._stop_threads()
+        self._raise_writer_exception()
+
+        for thread in self._threads:
+            thread.writer.close()
+
+    def abort(self):
+        """
+        Stops writing after a failed conversion, leaving the line-based
+        outputs as far as they got, e.g. to resume them later on.
+        """
+        self._stop_threads()
+        for thread in self._threads:
+            thread.writer.abort()
@@ -11,5 +11,9 @@ setup(
     description='',
     install_requires=[
         'rdflib==7.0.0',
-    ]
+    ],
+    extras_require={
+        'arrays': ['numpy'],
+        'parquet': ['pyarrow'],
+    }
 )
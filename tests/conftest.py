@@ -0,0 +1,37 @@
+import os
+import shutil
+
+import pytest
+
+from primekgtordf.node import NodesReader
+
+_data_dir_path = os.path.join(os.path.dirname(__file__), 'data')
+
+
+@pytest.fixture
+def nodes_file() -> str:
+    return os.path.join(_data_dir_path, 'nodes.csv')
+
+
+@pytest.fixture
+def edges_file(tmp_path) -> str:
+    # copied, since an edge index is stored next to the edges file
+    edges_file_path = os.path.join(tmp_path, 'edges.csv')
+    shutil.copyfile(os.path.join(_data_dir_path, 'edges.csv'), edges_file_path)
+
+    return edges_file_path
+
+
+@pytest.fixture
+def disease_features_file() -> str:
+    return os.path.join(_data_dir_path, 'disease_features.csv')
+
+
+@pytest.fixture
+def drug_features_file() -> str:
+    return os.path.join(_data_dir_path, 'drug_features.csv')
+
+
+@pytest.fixture
+def nodes_reader(nodes_file) -> NodesReader:
+    return NodesReader(nodes_file)
@@ -0,0 +1,74 @@
+import csv
+import json
+import os
+
+import pytest
+
+from primekgtordf.main import main
+from primekgtordf.node import NodeType
+from primekgtordf.relation import RelationType
+
+np = pytest.importorskip('numpy')
+
+
+def _read_edges(edges_file_path: str) -> list:
+    with open(edges_file_path, newline='') as edges_file:
+        return [
+            (row['relation'], int(row['x_index']), int(row['y_index']))
+            for row in csv.DictReader(edges_file)
+        ]
+
+
+def _load(arrays_dir_path: str, name: str):
+    return np.load(os.path.join(arrays_dir_path, name + '.npy'), mmap_mode='r')
+
+
+@pytest.mark.parametrize('relation_types', [None, ['drug_protein', 'indication']])
+def test_export_arrays(tmp_path, nodes_file, nodes_reader, edges_file, relation_types):
+    arrays_dir_path = os.path.join(tmp_path, 'arrays')
+
+    main(
+        nodes_file,
+        edges_file,
+        os.path.join(tmp_path, 'primekg.ttl'),
+        arrays_dir_path=arrays_dir_path,
+        relation_types=relation_types
+    )
+
+    with open(os.path.join(arrays_dir_path, 'meta.json')) as meta_file:
+        meta = json.load(meta_file)
+    node_types = [NodeType[name] for name in meta['node_types']]
+
+    assert meta['num_nodes'] == nodes_reader.get_num_nodes()
+    node_type = _load(arrays_dir_path, 'node_type')
+    node_uri = _load(arrays_dir_path, 'node_uri')
+    for node in nodes_reader.get_nodes():
+        assert node_types[node_type[node.node_index]] == node.node_type
+        assert node_uri[node.node_index] == str(node.get_uri())
+
+    expected_edges = [
+        (RelationType.get_type_by_id(relation_type_str).name, subj_node_idx, obj_node_idx)
+        for relation_type_str, subj_node_idx, obj_node_idx in _read_edges(edges_file)
+        if relation_types is None or relation_type_str in relation_types
+    ]
+    edges = [
+        (meta['relation_types'][code], int(src), int(dst))
+        for src, dst, code in zip(
+            _load(arrays_dir_path, 'edge_src'),
+            _load(arrays_dir_path, 'edge_dst'),
+            _load(arrays_dir_path, 'edge_type'))
+    ]
+    assert meta['num_edges'] == len(edges)
+    assert sorted(edges) == sorted(expected_edges)
+
+    # the CSR adjacency of each relation type holds the same edges
+    csr_edges = []
+    for name in meta['csr_relation_types']:
+        indptr = _load(arrays_dir_path, os.path.join('csr', name + '.indptr'))
+        indices = _load(arrays_dir_path, os.path.join('csr', name + '.indices'))
+        assert len(indptr) == meta['num_nodes'] + 1
+        for node_index in range(meta['num_nodes']):
+            for neighbor in indices[indptr[node_index]:indptr[node_index + 1]]:
+                csr_edges.append((name, node_index, int(neighbor)))
+    assert sorted(csr_edges) == sorted(expected_edges)
+
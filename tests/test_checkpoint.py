@@ -0,0 +1,147 @@
+import dataclasses
+import json
+import os
+import shutil
+
+import pytest
+
+from primekgtordf.checkpoint import Checkpoint, CheckpointingWriter, CheckpointMismatchException, \
+    IncompatibleCheckpointException, get_checkpoint_file_path
+from primekgtordf.node import NodesReader
+from primekgtordf.stream import convert_streaming
+
+
+def test_load_rejects_incompatible_checkpoint(tmp_path):
+    checkpoint_file_path = get_checkpoint_file_path(os.path.join(tmp_path, 'primekg.nt'))
+    with open(checkpoint_file_path, 'w') as checkpoint_file:
+        json.dump({'input_file_sizes': {}, 'unknown_field': 1}, checkpoint_file)
+
+    with pytest.raises(IncompatibleCheckpointException):
+        Checkpoint.load(checkpoint_file_path)
+
+
+class _Interruption(Exception):
+    pass
+
+
+def _convert(output_file_path: str, nodes_reader, edges_file, disease_features_file,
+             drug_features_file, **kwargs):
+    convert_streaming(
+        nodes_reader,
+        edges_file,
+        output_file_path,
+        disease_features_file,
+        drug_features_file,
+        batch_size=2,
+        checkpoint_interval=0,
+        **kwargs
+    )
+
+
+def _convert_interrupted(monkeypatch, output_file_path: str, *inputs, **kwargs):
+    write = CheckpointingWriter.write
+    num_writes = []
+
+    def interrupted_write(self, batch):
+        num_writes.append(batch)
+        if len(num_writes) == 6:
+            # the batch reaches the output, but not the checkpoint
+            self._output_writer.write(batch)
+            raise _Interruption()
+        return write(self, batch)
+
+    monkeypatch.setattr(CheckpointingWriter, 'write', interrupted_write)
+    with pytest.raises(_Interruption):
+        _convert(output_file_path, *inputs, **kwargs)
+    monkeypatch.undo()
+
+    assert os.path.exists(get_checkpoint_file_path(output_file_path))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_resume_matches_uninterrupted_run(
+        tmp_path, monkeypatch, nodes_reader, edges_file, disease_features_file,
+        drug_features_file, workers):
+    inputs = (nodes_reader, edges_file, disease_features_file, drug_features_file)
+    expected_file_path = os.path.join(tmp_path, 'expected.nt')
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    _convert(expected_file_path, *inputs, workers=workers)
+
+    _convert_interrupted(monkeypatch, output_file_path, *inputs, workers=workers)
+    assert 0 < os.path.getsize(output_file_path) < os.path.getsize(expected_file_path)
+
+    _convert(output_file_path, *inputs, workers=workers, resume=True)
+
+    with open(output_file_path, 'rb') as output_file, open(expected_file_path, 'rb') as expected_file:
+        assert output_file.read() == expected_file.read()
+    assert not os.path.exists(get_checkpoint_file_path(output_file_path))
+
+
+@pytest.mark.parametrize('outputs, resume_outputs', [
+    ([], [('nq', 'primekg.nq')]),
+    ([('nq', 'primekg.nq')], []),
+    ([('nq', 'primekg.nq')], [('nq', 'other.nq')]),
+    ([('nq', 'primekg.nq')], [('ttl', 'primekg.nq')]),
+])
+def test_resume_rejects_other_outputs(
+        tmp_path, monkeypatch, nodes_reader, edges_file, outputs, resume_outputs):
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    _convert_interrupted(
+        monkeypatch, output_file_path, nodes_reader, edges_file, None, None,
+        outputs=[(rdf_format, os.path.join(tmp_path, path)) for rdf_format, path in outputs])
+
+    # e.g. the output of an earlier run, which must not be truncated
+    existing_content = b'<urn:s> <urn:p> <urn:o> .\n'
+    for _, path in resume_outputs:
+        if not os.path.exists(os.path.join(tmp_path, path)):
+            with open(os.path.join(tmp_path, path), 'wb') as existing_file:
+                existing_file.write(existing_content)
+    sizes = {path: os.path.getsize(os.path.join(tmp_path, path)) for path in os.listdir(tmp_path)}
+
+    with pytest.raises(CheckpointMismatchException, match='outputs'):
+        _convert(
+            output_file_path, nodes_reader, edges_file, None, None, resume=True,
+            outputs=[(rdf_format, os.path.join(tmp_path, path)) for rdf_format, path in resume_outputs])
+
+    assert {path: os.path.getsize(os.path.join(tmp_path, path)) for path in os.listdir(tmp_path)} == sizes
+
+
+def test_resume_rejects_input_modified_in_place(tmp_path, nodes_reader, edges_file):
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    checkpoint = Checkpoint.create([nodes_reader.nodes_file_path, edges_file])
+    checkpoint.save(get_checkpoint_file_path(output_file_path))
+
+    # same size, different content
+    with open(edges_file, 'r+') as modified_file:
+        modified_file.seek(os.path.getsize(edges_file) - 4)
+        modified_file.write('8,6\n')
+    os.utime(edges_file, ns=(0, checkpoint.input_file_mtimes[edges_file] + 1))
+
+    with pytest.raises(CheckpointMismatchException, match='modified'):
+        convert_streaming(nodes_reader, edges_file, output_file_path, resume=True)
+
+
+def test_resume_rejects_modified_nodes_file(tmp_path, nodes_file, edges_file):
+    nodes_copy_file_path = os.path.join(tmp_path, 'nodes.csv')
+    shutil.copyfile(nodes_file, nodes_copy_file_path)
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    checkpoint = Checkpoint.create([nodes_copy_file_path, edges_file])
+    checkpoint.save(get_checkpoint_file_path(output_file_path))
+
+    with open(nodes_copy_file_path, 'a') as modified_file:
+        modified_file.write('10,1234,gene/protein,ABC,NCBI\n')
+
+    with pytest.raises(CheckpointMismatchException, match='do not match'):
+        convert_streaming(NodesReader(nodes_copy_file_path), edges_file, output_file_path, resume=True)
+
+
+def test_load_requires_input_file_mtimes(tmp_path, edges_file):
+    checkpoint_file_path = get_checkpoint_file_path(os.path.join(tmp_path, 'primekg.nt'))
+    checkpoint = Checkpoint.create([edges_file])
+    fields = dataclasses.asdict(checkpoint)
+    del fields['input_file_mtimes']
+    with open(checkpoint_file_path, 'w') as checkpoint_file:
+        json.dump(fields, checkpoint_file)
+
+    with pytest.raises(IncompatibleCheckpointException):
+        Checkpoint.load(checkpoint_file_path)
@@ -0,0 +1,39 @@
+import os
+
+from primekgtordf.csvfile import iter_csv_records, iter_csv_records_at
+
+
+def _write(tmp_path, content: bytes) -> str:
+    file_path = os.path.join(tmp_path, 'records.csv')
+    with open(file_path, 'wb') as csv_file:
+        csv_file.write(content)
+
+    return file_path
+
+
+def test_stray_quote_in_unquoted_field(tmp_path):
+    file_path = _write(tmp_path, b'a,5" tube,b\r\nc,"d\r\ne",f\r\ng,h,i\r\n')
+
+    records = list(iter_csv_records(file_path))
+
+    assert [row for row, _ in records] == [['a', '5" tube', 'b'], ['c', 'd\r\ne', 'f'], ['g', 'h', 'i']]
+    assert [end_offset for _, end_offset in records] == [13, 25, 32]
+
+
+def test_continue_at_end_offsets(tmp_path, edges_file):
+    records = list(iter_csv_records(edges_file))
+    assert records[-1][1] == os.path.getsize(edges_file)
+
+    for i, (_, end_offset) in enumerate(records):
+        assert list(iter_csv_records(edges_file, end_offset)) == records[i + 1:]
+
+    start_offsets = [0] + [end_offset for _, end_offset in records[:-1]]
+    assert list(iter_csv_records_at(edges_file, start_offsets[::-1])) == records[::-1]
+
+
+def test_non_ascii_offsets(tmp_path):
+    file_path = _write(tmp_path, 'é,"ü\nö"\nx,y\n'.encode('utf-8'))
+
+    records = list(iter_csv_records(file_path))
+
+    assert records == [(['é', 'ü\nö'], len('é,"ü\nö"\n'.encode('utf-8'))), (['x', 'y'], os.path.getsize(file_path))]
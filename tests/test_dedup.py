@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+from primekgtordf.checkpoint import CheckpointMismatchException, CheckpointingWriter
+from primekgtordf.dedup import Deduplicator, UnknownDedupModeException, dedup_modes, get_dedup_db_file_path
+from primekgtordf.main import main
+
+
+class _Interruption(Exception):
+    pass
+
+
+def _convert(output_file_path: str, nodes_file, edges_file, disease_features_file,
+             drug_features_file, **kwargs):
+    main(
+        nodes_file,
+        edges_file,
+        output_file_path,
+        disease_features_file,
+        drug_features_file,
+        streaming=True,
+        batch_size=2,
+        checkpoint_interval=0,
+        **kwargs
+    )
+
+
+def _read_lines(file_path: str) -> list:
+    with open(file_path, 'rb') as lines_file:
+        return lines_file.readlines()
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('dedup', dedup_modes)
+def test_dedup_keeps_first_occurrences(
+        tmp_path, nodes_file, edges_file, disease_features_file, drug_features_file,
+        dedup, workers):
+    inputs = (nodes_file, edges_file, disease_features_file, drug_features_file)
+    output_file_path = os.path.join(tmp_path, 'dedup.nt')
+    duplicates_file_path = os.path.join(tmp_path, 'duplicates.nt')
+
+    _convert(duplicates_file_path, *inputs)
+    _convert(output_file_path, *inputs, dedup=dedup, workers=workers)
+
+    lines = _read_lines(duplicates_file_path)
+    assert len(set(lines)) < len(lines)
+    assert _read_lines(output_file_path) == list(dict.fromkeys(lines))
+    assert not os.path.exists(get_dedup_db_file_path(output_file_path))
+
+
+def _convert_interrupted(monkeypatch, output_file_path: str, *inputs, **kwargs):
+    write = CheckpointingWriter.write
+    num_writes = []
+
+    def interrupted_write(self, batch):
+        num_writes.append(batch)
+        if len(num_writes) == 8:
+            # the batch reaches the output, but not the checkpoint
+            self._output_writer.write(batch)
+            raise _Interruption()
+        return write(self, batch)
+
+    monkeypatch.setattr(CheckpointingWriter, 'write', interrupted_write)
+    with pytest.raises(_Interruption):
+        _convert(output_file_path, *inputs, **kwargs)
+    monkeypatch.undo()
+
+
+@pytest.mark.parametrize('dedup', dedup_modes)
+def test_resumed_dedup_matches_uninterrupted_run(
+        tmp_path, monkeypatch, nodes_file, edges_file, disease_features_file,
+        drug_features_file, dedup):
+    inputs = (nodes_file, edges_file, disease_features_file, drug_features_file)
+    expected_file_path = os.path.join(tmp_path, 'expected.nt')
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    _convert(expected_file_path, *inputs, dedup=dedup)
+
+    _convert_interrupted(monkeypatch, output_file_path, *inputs, dedup=dedup)
+    _convert(output_file_path, *inputs, dedup=dedup, resume=True)
+
+    assert _read_lines(output_file_path) == _read_lines(expected_file_path)
+
+
+@pytest.mark.parametrize('options, resumed_options', [
+    ({'dedup': 'memory'}, {}),
+    ({}, {'dedup': 'memory'}),
+    ({'dedup': 'memory'}, {'dedup': 'disk'}),
+    ({'dedup': 'bloom'}, {'dedup': 'bloom', 'dedup_capacity': 1000}),
+    ({'dedup': 'bloom'}, {'dedup': 'bloom', 'dedup_error_rate': 0.01}),
+])
+def test_resume_rejects_other_dedup(
+        tmp_path, monkeypatch, nodes_file, edges_file, disease_features_file,
+        drug_features_file, options, resumed_options):
+    inputs = (nodes_file, edges_file, disease_features_file, drug_features_file)
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    _convert_interrupted(monkeypatch, output_file_path, *inputs, **options)
+    output_size = os.path.getsize(output_file_path)
+
+    with pytest.raises(CheckpointMismatchException):
+        _convert(output_file_path, *inputs, resume=True, **resumed_options)
+    assert os.path.getsize(output_file_path) == output_size
+
+
+def test_bloom_filter_error_rate():
+    deduplicator = Deduplicator('bloom', capacity=1000, error_rate=0.01)
+    lines = [f'<urn:s{i}> <urn:p> <urn:o> .\n'.encode('utf-8') for i in range(1000)]
+    try:
+        new_lines = deduplicator.filter_lines(lines)
+        assert len(new_lines) > 950
+        assert deduplicator.filter_lines(lines) == []
+    finally:
+        deduplicator.close()
+
+
+def test_unknown_dedup_mode():
+    with pytest.raises(UnknownDedupModeException):
+        Deduplicator('foo')
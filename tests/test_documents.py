@@ -0,0 +1,62 @@
+import glob
+import json
+import os
+import pathlib
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.documents import export_documents, get_context
+from primekgtordf.stream import iter_triples
+from primekgtordf.vocab import get_property, get_property_abbreviations
+
+_node_prefix = PRIMEKG_URI_PREFIX + 'node/'
+
+
+def test_context_declares_all_relation_properties():
+    context = get_context()['@context']
+
+    for property_abbrv_str in get_property_abbreviations():
+        key = str(get_property(property_abbrv_str))[len(context['@vocab']):]
+        assert context[key] == {'@type': '@id'}
+
+
+@pytest.mark.parametrize('workers, num_shards', [(1, 1), (2, 3)])
+def test_documents_hold_node_triples(
+        tmp_path, nodes_reader, edges_file, disease_features_file, drug_features_file,
+        workers, num_shards):
+    output_dir_path = os.path.join(tmp_path, 'documents')
+    context_ref = pathlib.Path(output_dir_path, 'context.jsonld').as_uri()
+
+    export_documents(
+        nodes_reader,
+        edges_file,
+        output_dir_path,
+        disease_features_file,
+        drug_features_file,
+        workers=workers,
+        num_shards=num_shards,
+        context_ref=context_ref
+    )
+
+    g = Graph()
+    node_ids = []
+    shard_file_paths = sorted(glob.glob(os.path.join(output_dir_path, 'part-*.ndjson')))
+    assert len(shard_file_paths) == num_shards
+    for shard_file_path in shard_file_paths:
+        with open(shard_file_path) as shard_file:
+            for line in shard_file:
+                node_ids.append(json.loads(line)['@id'])
+                g.parse(data=line, format='json-ld')
+
+    # one document per node, each describing the node itself, i.e. all
+    # triples of a conversion except the vocabulary
+    assert len(node_ids) == len(set(node_ids)) == nodes_reader.get_num_nodes()
+    expected = Graph()
+    for triples in iter_triples(nodes_reader, edges_file, disease_features_file, drug_features_file):
+        for s, p, o in triples:
+            if str(s).startswith(_node_prefix):
+                expected.add((s, p, o))
+    assert isomorphic(g, expected)
@@ -0,0 +1,59 @@
+import logging
+from collections import Counter
+from decimal import Decimal
+
+import pytest
+from rdflib import Literal, URIRef, XSD
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.drugfeatures import DrugFeaturesReader, _get_decimal_lexical, _parse_half_life
+from primekgtordf.vocab import has_clogp, has_half_life_seconds, has_molecular_weight, has_tpsa
+
+
+def _node(node_id: str) -> URIRef:
+    return URIRef(PRIMEKG_URI_PREFIX + 'node/' + node_id)
+
+
+@pytest.mark.parametrize('value, lexical', [
+    (Decimal('410400'), '410400.0'),
+    (Decimal('1.50'), '1.5'),
+    (Decimal('-2.41'), '-2.41'),
+    (Decimal('4.104E+5'), '410400.0'),
+    (Decimal('-0'), '0.0'),
+])
+def test_get_decimal_lexical(value, lexical):
+    assert _get_decimal_lexical(value) == lexical
+
+
+@pytest.mark.parametrize('value, seconds', [
+    ('The half-life is approximately 122.24 seconds', '122.24'),
+    ('The half-life is 1.8 hours', '6480.0'),
+    ('The half-life is about 2 days.', '172800.0'),
+    ('Varies, 2-3 hours', None),
+    ('', None),
+])
+def test_parse_half_life(value, seconds):
+    assert _parse_half_life(value) == seconds
+
+
+def test_numeric_literals(nodes_reader, drug_features_file):
+    g = DrugFeaturesReader(drug_features_file, nodes_reader).to_rdf()
+
+    lepirudin = _node('DB00001')
+    assert set(g.objects(lepirudin, has_half_life_seconds)) == {Literal('4680.0', datatype=XSD.decimal)}
+    assert set(g.objects(lepirudin, has_molecular_weight)) == {Literal('6979.5', datatype=XSD.decimal)}
+    assert set(g.objects(lepirudin, has_tpsa)) == {Literal('93.06', datatype=XSD.decimal)}
+    assert set(g.objects(lepirudin, has_clogp)) == {Literal('-2.41', datatype=XSD.decimal)}
+
+    cetuximab = _node('DB00002')
+    assert set(g.objects(cetuximab, has_half_life_seconds)) == {Literal('410400.0', datatype=XSD.decimal)}
+    assert set(g.objects(cetuximab, has_clogp)) == set()
+
+
+def test_malformed_values_are_counted(nodes_reader, drug_features_file, caplog):
+    with caplog.at_level(logging.INFO):
+        reader = DrugFeaturesReader(drug_features_file, nodes_reader)
+
+    assert reader.num_malformed == Counter({'half_life': 1, 'clogp': 1})
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+    assert 'Skipped unparseable values: 1 clogp, 1 half_life' in caplog.messages
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+from rdflib import RDF, Dataset, Graph, URIRef
+from rdflib.compare import isomorphic
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.encoded import EncodedTriples, decode, encode
+from primekgtordf.stream import iter_triples
+from primekgtordf.writers import UnknownOutputFormatException, graph_name
+
+_node_uri = PRIMEKG_URI_PREFIX + 'node/'
+
+
+@pytest.fixture
+def expected_graph(nodes_file, edges_file, disease_features_file, drug_features_file) -> Graph:
+    g = Graph()
+    for triples in iter_triples(nodes_file, edges_file, disease_features_file, drug_features_file):
+        for triple in triples:
+            g.add(triple)
+
+    return g
+
+
+@pytest.fixture
+def encoded_dir(tmp_path, nodes_file, edges_file, disease_features_file, drug_features_file) -> str:
+    encoded_dir_path = os.path.join(tmp_path, 'encoded')
+    encode(nodes_file, edges_file, encoded_dir_path, disease_features_file, drug_features_file)
+
+    return encoded_dir_path
+
+
+@pytest.mark.parametrize('rdf_format, parse_format', [
+    ('nt', 'nt'),
+    ('ntriples', 'nt'),
+    ('ttl', 'turtle'),
+    ('turtle', 'turtle'),
+    ('xml', 'xml'),
+])
+def test_decode(tmp_path, encoded_dir, expected_graph, rdf_format, parse_format):
+    output_file_path = os.path.join(tmp_path, 'decoded')
+
+    decode(encoded_dir, output_file_path, rdf_format)
+
+    assert isomorphic(Graph().parse(output_file_path, format=parse_format), expected_graph)
+
+
+def test_decode_turtle_is_no_ntriples(tmp_path, encoded_dir):
+    output_file_path = os.path.join(tmp_path, 'decoded.ttl')
+
+    decode(encoded_dir, output_file_path, 'ttl')
+
+    with open(output_file_path) as output_file:
+        assert output_file.readline().startswith('@prefix')
+
+
+@pytest.mark.parametrize('rdf_format', ['nq', 'nquads', 'trig', 'trix'])
+@pytest.mark.parametrize('graph', [None, 'https://example.org/graph'])
+def test_decode_quads(tmp_path, encoded_dir, expected_graph, rdf_format, graph):
+    output_file_path = os.path.join(tmp_path, 'decoded')
+
+    decode(encoded_dir, output_file_path, rdf_format, graph)
+
+    dataset = Dataset()
+    dataset.parse(output_file_path, format={'nq': 'nquads'}.get(rdf_format, rdf_format))
+    assert isomorphic(dataset.graph(graph_name if graph is None else URIRef(graph)), expected_graph)
+
+
+def test_decode_unknown_format(tmp_path, encoded_dir):
+    with pytest.raises(UnknownOutputFormatException):
+        decode(encoded_dir, os.path.join(tmp_path, 'decoded'), 'foo')
+
+
+@pytest.mark.parametrize('filters', [
+    {'predicates': [str(RDF.type)]},
+    {'subjects': [_node_uri + '9796', _node_uri + 'DB00001']},
+    {'predicates': [str(RDF.type)], 'subjects': [_node_uri + 'DB00001']},
+])
+def test_decode_filtered(tmp_path, encoded_dir, expected_graph, filters):
+    output_file_path = os.path.join(tmp_path, 'decoded.nt')
+    predicates = filters.get('predicates')
+    subjects = filters.get('subjects')
+    expected = Graph()
+    for s, p, o in expected_graph:
+        if (predicates is None or str(p) in predicates) and (subjects is None or str(s) in subjects):
+            expected.add((s, p, o))
+    assert len(expected) > 0
+
+    decode(encoded_dir, output_file_path, predicates=predicates, subjects=subjects)
+
+    assert isomorphic(Graph().parse(output_file_path, format='nt'), expected)
+
+
+def test_iter_id_triples_in_encoded_order(encoded_dir, nodes_file, edges_file,
+                                          disease_features_file, drug_features_file):
+    encoded = EncodedTriples(encoded_dir)
+    try:
+        lines = b''.join(encoded.iter_ntriples_lines())
+        assert len(list(encoded.iter_id_triples())) == encoded.num_triples
+    finally:
+        encoded.close()
+
+    expected_lines = ''.join(iter_triples(
+        nodes_file, edges_file, disease_features_file, drug_features_file, as_ntriples=True))
+    assert lines.decode('utf-8') == expected_lines
@@ -0,0 +1,66 @@
+import csv
+import os
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from primekgtordf.csvfile import iter_projected_rows
+from primekgtordf.drugfeatures import drug_feature_columns
+from primekgtordf.features import UnknownColumnException, get_feature_property
+from primekgtordf.main import main
+from primekgtordf.vocab import has_drug_description
+
+
+@pytest.mark.parametrize('column_indexes', [[0, 1, 5], [5, 0], [0]])
+def test_iter_projected_rows(disease_features_file, column_indexes):
+    with open(disease_features_file) as features_file:
+        expected = [
+            [row[i] for i in column_indexes]
+            for row in csv.reader(features_file, delimiter=',', quotechar='"')
+        ]
+
+    assert list(iter_projected_rows(disease_features_file, column_indexes)) == expected
+
+
+def test_iter_projected_rows_pads_short_rows(tmp_path):
+    file_path = os.path.join(tmp_path, 'short.csv')
+    with open(file_path, 'w') as csv_file:
+        csv_file.write('a,b,c\n\n1,"x\ny"\n')
+
+    assert list(iter_projected_rows(file_path, [0, 2, 1])) == [['a', 'c', 'b'], ['1', '', 'x\ny']]
+
+
+def test_select():
+    columns = drug_feature_columns.select(['description', 'indication'])
+
+    assert [column.property for column in columns.columns] == \
+        [has_drug_description, get_feature_property('indication')]
+    assert columns.column_indexes == [0, 1, 3]
+
+    with pytest.raises(UnknownColumnException):
+        drug_feature_columns.select(['unknown'])
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_streaming_uses_column_selection(
+        tmp_path, nodes_file, edges_file, disease_features_file, drug_features_file, workers):
+    graph_file_path = os.path.join(tmp_path, 'primekg.ttl')
+    streaming_file_path = os.path.join(tmp_path, 'primekg.nt')
+    options = dict(
+        disease_features_file_path=disease_features_file,
+        drug_features_file_path=drug_features_file,
+        disease_columns=['mondo_name', 'mayo_symptoms'],
+        drug_columns=['indication', 'molecular_weight'],
+    )
+
+    main(nodes_file, edges_file, graph_file_path, **options)
+    main(nodes_file, edges_file, streaming_file_path, streaming=True, workers=workers, **options)
+
+    g = Graph().parse(streaming_file_path, format='nt')
+    assert isomorphic(g, Graph().parse(graph_file_path, format='turtle'))
+
+    predicates = set(g.predicates())
+    assert get_feature_property('indication') in predicates
+    assert get_feature_property('mayo_symptoms') in predicates
+    assert has_drug_description not in predicates
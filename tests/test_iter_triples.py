@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+import primekgtordf
+from primekgtordf import vocab
+from primekgtordf.disesefeatures import DiseaseFeaturesReader
+from primekgtordf.drugfeatures import DrugFeaturesReader
+from primekgtordf.relation import RelationsReader
+
+
+def test_package_import_is_lazy():
+    code = 'import sys, primekgtordf; print("primekgtordf.stream" in sys.modules)'
+    output = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == 'False'
+
+
+def test_iter_triples_matches_readers(
+        nodes_reader, nodes_file, edges_file, disease_features_file, drug_features_file):
+    expected = Graph()
+    expected += vocab.get_vocab_triples()
+    expected += RelationsReader(edges_file, nodes_reader).to_rdf()
+    expected += DiseaseFeaturesReader(disease_features_file, nodes_reader).to_rdf()
+    expected += DrugFeaturesReader(drug_features_file, nodes_reader).to_rdf()
+
+    g = Graph()
+    batches = primekgtordf.iter_triples(
+        nodes_file,
+        edges_file,
+        disease_features=disease_features_file,
+        drug_features=drug_features_file,
+        batch_size=4
+    )
+    for triples in batches:
+        for triple in triples:
+            g.add(triple)
+
+    assert isomorphic(g, expected)
+
+
+def test_iter_triples_as_ntriples(nodes_file, edges_file):
+    g = Graph()
+    triples = Graph()
+    for lines in primekgtordf.iter_triples(nodes_file, edges_file, as_ntriples=True):
+        g.parse(data=lines, format='nt')
+    for batch in primekgtordf.iter_triples(nodes_file, edges_file):
+        for triple in batch:
+            triples.add(triple)
+
+    assert isomorphic(g, triples)
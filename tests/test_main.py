@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize('options', [
+    ['--streaming', '--arrays-dir', 'arrays'],
+    ['--resume'],
+    ['--workers', '2'],
+    ['--queue-size', '2'],
+    ['--checkpoint-interval', '1'],
+])
+def test_mode_specific_options_are_rejected(tmp_path, nodes_file, edges_file, options):
+    output_file_path = os.path.join(tmp_path, 'primekg.ttl')
+
+    result = subprocess.run(
+        [sys.executable, '-m', 'primekgtordf.main', nodes_file, edges_file, output_file_path] + options,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True
+    )
+
+    assert result.returncode == 2
+    assert 'requires' in result.stderr
+    assert not os.path.exists(output_file_path)
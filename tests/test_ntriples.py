@@ -0,0 +1,34 @@
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef, XSD
+
+from primekgtordf.ntriples import get_line, to_ntriples
+
+_s = URIRef('https://zitniklab.hms.harvard.edu/projects/PrimeKG/node/DB00001')
+_p = URIRef('https://zitniklab.hms.harvard.edu/projects/PrimeKG/vocab/has_drug_description')
+
+
+@pytest.mark.parametrize('o', [
+    URIRef('https://www.drugbank.com'),
+    BNode('b0'),
+    Literal('PHYHIP', 'en'),
+    Literal('4680.0', datatype=XSD.decimal),
+    Literal('plain'),
+    Literal('a "quoted" \\ text\nwith\r\nline breaks', 'en'),
+    Literal('Müllerian'),
+])
+def test_get_line_matches_rdflib(o):
+    g = Graph()
+    g.add((_s, _p, o))
+
+    assert get_line((_s, _p, o)) == g.serialize(format='nt')
+
+
+def test_to_ntriples_round_trip():
+    triples = [
+        (_s, _p, Literal('first', 'en')),
+        (_s, _p, Literal('second\nline', 'en')),
+    ]
+
+    g = Graph().parse(data=to_ntriples(triples), format='nt')
+
+    assert set(g) == set(triples)
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+from rdflib import Dataset, Graph
+from rdflib.compare import isomorphic
+
+from primekgtordf.main import main
+from primekgtordf.stream import convert_streaming
+from primekgtordf.verify import get_manifest_file_path, verify
+from primekgtordf.writers import UnknownOutputFormatException, graph_name, normalize_format, \
+    parse_output_target
+
+# all formats documented for --output, i.e. the short names and some of the
+# other rdflib serializations
+_documented_formats = [
+    'nt', 'ntriples', 'nt11', 'nq', 'nquads', 'ttl', 'turtle', 'xml', 'json-ld', 'trig', 'trix']
+
+_quad_formats = ['nq', 'nquads', 'trig', 'trix']
+
+
+@pytest.mark.parametrize('rdf_format, normalized_format', [
+    ('nt', 'ntriples'),
+    ('nt11', 'ntriples'),
+    ('nq', 'nquads'),
+    ('ttl', 'turtle'),
+    ('json-ld', 'json-ld'),
+])
+def test_normalize_format(rdf_format, normalized_format):
+    assert normalize_format(rdf_format) == normalized_format
+    assert parse_output_target(rdf_format + ':out/x') == (normalized_format, 'out/x')
+
+
+def test_unknown_format():
+    with pytest.raises(UnknownOutputFormatException):
+        parse_output_target('foo:out.foo')
+
+    with pytest.raises(UnknownOutputFormatException):
+        parse_output_target('out.nt')
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+@pytest.mark.parametrize('rdf_format', _documented_formats)
+def test_output_formats(tmp_path, nodes_file, edges_file, drug_features_file, rdf_format, streaming):
+    output_file_path = os.path.join(tmp_path, 'primekg.out')
+    extra_output_file_path = os.path.join(tmp_path, 'extra.out')
+
+    main(
+        nodes_file,
+        edges_file,
+        output_file_path,
+        drug_features_file_path=drug_features_file,
+        streaming=streaming,
+        outputs=[(rdf_format, extra_output_file_path)]
+    )
+
+    expected = Graph().parse(output_file_path, format='nt' if streaming else 'turtle')
+    normalized_format = normalize_format(rdf_format)
+    if rdf_format in _quad_formats:
+        dataset = Dataset()
+        dataset.parse(extra_output_file_path, format=normalized_format)
+        assert isomorphic(dataset.graph(graph_name), expected)
+        assert len(dataset.graph(graph_name)) == len(dataset)
+    else:
+        g = Graph().parse(extra_output_file_path, format=normalized_format)
+        assert isomorphic(g, expected)
+
+    assert verify(get_manifest_file_path(output_file_path), workers=1)
+
+
+def test_workers_reject_rdflib_formats_before_writing(tmp_path, nodes_reader, edges_file):
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    existing_content = b'<urn:s> <urn:p> <urn:o> .\n'
+    with open(output_file_path, 'wb') as output_file:
+        output_file.write(existing_content)
+
+    with pytest.raises(UnknownOutputFormatException):
+        convert_streaming(
+            nodes_reader, edges_file, output_file_path, workers=2,
+            outputs=[('xml', os.path.join(tmp_path, 'primekg.xml'))])
+
+    with open(output_file_path, 'rb') as output_file:
+        assert output_file.read() == existing_content
+    assert not os.path.exists(os.path.join(tmp_path, 'primekg.xml'))
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from primekgtordf.main import main
+from primekgtordf.node import NodesReader
+from primekgtordf.parquet import iter_parquet_rows
+from primekgtordf.stream import UnsupportedInputException, convert_streaming, iter_triples
+
+pa = pytest.importorskip('pyarrow')
+pa_csv = pytest.importorskip('pyarrow.csv')
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+def _to_parquet(csv_file_path: str, parquet_file_path: str, row_group_size: int = 4):
+    table = pa_csv.read_csv(
+        csv_file_path, parse_options=pa_csv.ParseOptions(newlines_in_values=True))
+    pq.write_table(table, parquet_file_path, row_group_size=row_group_size)
+
+
+@pytest.fixture
+def parquet_files(tmp_path, nodes_file, edges_file, disease_features_file, drug_features_file) -> dict:
+    parquet_files = {}
+    for name, csv_file_path in [
+            ('nodes', nodes_file),
+            ('edges', edges_file),
+            ('disease_features', disease_features_file),
+            ('drug_features', drug_features_file)]:
+        parquet_files[name] = os.path.join(tmp_path, name + '.parquet')
+        _to_parquet(csv_file_path, parquet_files[name])
+
+    return parquet_files
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'relation_types': ['indication', 'drug_protein']},
+    {'seed_node_indexes': [9], 'hops': 2},
+])
+def test_parquet_matches_csv(
+        tmp_path, parquet_files, nodes_file, edges_file, disease_features_file,
+        drug_features_file, options):
+    csv_output_file_path = os.path.join(tmp_path, 'csv.ttl')
+    parquet_output_file_path = os.path.join(tmp_path, 'parquet.ttl')
+
+    main(
+        nodes_file,
+        edges_file,
+        csv_output_file_path,
+        disease_features_file,
+        drug_features_file,
+        **options
+    )
+    main(
+        parquet_files['nodes'],
+        parquet_files['edges'],
+        parquet_output_file_path,
+        parquet_files['disease_features'],
+        parquet_files['drug_features'],
+        **options
+    )
+
+    assert isomorphic(
+        Graph().parse(parquet_output_file_path, format='turtle'),
+        Graph().parse(csv_output_file_path, format='turtle'))
+
+
+@pytest.mark.parametrize('parquet_input', ['edges', 'disease_features', 'drug_features'])
+def test_streaming_rejects_parquet_inputs(
+        tmp_path, parquet_files, nodes_file, edges_file, disease_features_file,
+        drug_features_file, parquet_input):
+    output_file_path = os.path.join(tmp_path, 'output.nt')
+    inputs = {
+        'edges': edges_file,
+        'disease_features': disease_features_file,
+        'drug_features': drug_features_file,
+    }
+    inputs[parquet_input] = parquet_files[parquet_input]
+    nodes_reader = NodesReader(nodes_file)
+
+    with pytest.raises(UnsupportedInputException, match='Parquet'):
+        next(iter_triples(
+            nodes_reader, inputs['edges'], inputs['disease_features'], inputs['drug_features']))
+    with pytest.raises(UnsupportedInputException, match='Parquet'):
+        convert_streaming(
+            nodes_reader,
+            inputs['edges'],
+            output_file_path,
+            inputs['disease_features'],
+            inputs['drug_features']
+        )
+    assert not os.path.exists(output_file_path)
+
+
+def test_string_node_index_row_groups_are_not_skipped(tmp_path):
+    file_path = os.path.join(tmp_path, 'features.parquet')
+    # lexicographic bounds '10'..'9' of the first row group, which are no
+    # valid range of integers
+    table = pa.table({
+        'node_index': ['9', '10', '11', '12'],
+        'value': ['a', 'b', 'c', 'd'],
+    })
+    pq.write_table(table, file_path, row_group_size=2)
+
+    rows = iter_parquet_rows(file_path, ['node_index', 'value'], [(['node_index'], {9, 12})])
+
+    assert [row for row, _ in rows] == [['9', 'a'], ['10', 'b'], ['11', 'c'], ['12', 'd']]
+
+
+def test_int_node_index_row_groups_are_skipped(tmp_path):
+    file_path = os.path.join(tmp_path, 'features.parquet')
+    table = pa.table({'node_index': [1, 2, 3, 4], 'value': ['a', 'b', 'c', 'd']})
+    pq.write_table(table, file_path, row_group_size=2)
+
+    rows = iter_parquet_rows(file_path, ['node_index', 'value'], [(['node_index'], {4})])
+
+    assert [(row, row_number) for row, row_number in rows] == [(['3', 'c'], 2), (['4', 'd'], 3)]
+
+
+def test_float_node_indexes(tmp_path, nodes_file):
+    file_path = os.path.join(tmp_path, 'nodes.parquet')
+    table = pa_csv.read_csv(
+        nodes_file, parse_options=pa_csv.ParseOptions(newlines_in_values=True))
+    # as written by pandas for a column with missing values
+    table = table.set_column(0, 'node_index', table.column('node_index').cast(pa.float64()))
+    pq.write_table(table, file_path)
+
+    nodes_reader = NodesReader(file_path)
+
+    assert nodes_reader.get_node_by_index(9) == NodesReader(nodes_file).get_node_by_index(9)
+    assert list(iter_parquet_rows(file_path, ['node_index']))[0] == (['0'], 0)
+    assert list(iter_parquet_rows(
+        file_path, ['node_index'], [(['node_index'], {5})]))[0] == (['0'], 0)
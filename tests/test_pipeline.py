@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from primekgtordf.pipeline import Pipeline
+
+
+class _StageException(Exception):
+    pass
+
+
+def _slow(batch):
+    time.sleep(0.01)
+    return batch
+
+
+def _get_pipeline(queue_size: int, results: list, stage=_slow) -> Pipeline:
+    pipeline = Pipeline(queue_size=queue_size)
+    pipeline.add_source('read', ([i] * 2 for i in range(40)))
+    pipeline.add_stage('convert', lambda batch: [i + 1 for i in batch])
+    pipeline.add_stage('slow', stage)
+    pipeline.add_stage('write', results.extend)
+
+    return pipeline
+
+
+@pytest.mark.parametrize('queue_size', [1, 3])
+def test_slow_stage_is_bottleneck(queue_size):
+    results = []
+    pipeline = _get_pipeline(queue_size, results)
+
+    pipeline.run(sample_interval=0.001)
+
+    assert results == [i + 1 for i in range(40) for _ in range(2)]
+
+    stage_stats = {stats.name: stats for stats in pipeline.get_stage_stats()}
+    assert list(stage_stats) == ['read', 'convert', 'slow', 'write']
+    for stats in stage_stats.values():
+        assert stats.batches == 40
+        assert stats.items == 80
+    assert max(stage_stats.values(), key=lambda stats: stats.busy_seconds).name == 'slow'
+    assert pipeline.get_report().endswith('bottleneck stage: slow')
+
+    queue_stats = {stats.name: stats for stats in pipeline.get_queue_stats()}
+    assert list(queue_stats) == ['read->convert', 'convert->slow', 'slow->write']
+    for stats in queue_stats.values():
+        assert stats.samples > 0
+        assert stats.max_occupancy <= queue_size
+    # batches pile up in front of the bottleneck, not behind it
+    assert queue_stats['convert->slow'].get_mean_occupancy() > queue_stats['slow->write'].get_mean_occupancy()
+
+
+def test_stage_exception_is_raised():
+    num_batches = []
+
+    def failing(batch):
+        num_batches.append(batch)
+        if len(num_batches) == 5:
+            raise _StageException()
+        return batch
+
+    results = []
+    pipeline = _get_pipeline(2, results, failing)
+
+    with pytest.raises(_StageException):
+        pipeline.run()
+
+    assert len(results) < 80
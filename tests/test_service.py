@@ -0,0 +1,129 @@
+import csv
+import os
+import shutil
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from primekgtordf.service import FeatureIndex, NodeDescriber, get_request_handler
+
+
+@pytest.fixture
+def disease_features_copy_file(tmp_path, disease_features_file) -> str:
+    # copied, since the feature index is stored next to the features file
+    file_path = os.path.join(tmp_path, 'disease_features.csv')
+    shutil.copyfile(disease_features_file, file_path)
+
+    return file_path
+
+
+def test_feature_index_offsets(disease_features_copy_file):
+    index = FeatureIndex.get(disease_features_copy_file)
+
+    with open(disease_features_copy_file, 'rb') as features_file:
+        for node_index in [5, 6, 9]:
+            offsets = index.get_offsets(node_index)
+            assert len(offsets) == 1
+            features_file.seek(offsets[0])
+            assert features_file.read(2) == f'{node_index},'.encode('utf-8')
+
+    assert index.get_offsets(0) == []
+    assert FeatureIndex.get(disease_features_copy_file).get_offsets(9) == index.get_offsets(9)
+
+
+def test_feature_index_of_reordered_file_is_rebuilt(
+        nodes_reader, edges_file, disease_features_copy_file):
+    node_describer = NodeDescriber(nodes_reader, edges_file, disease_features_copy_file)
+    triples = {node_index: set(node_describer.get_triples(node_index)) for node_index in [5, 6, 9]}
+    index = FeatureIndex.get(disease_features_copy_file)
+
+    # same size, but the records are at different offsets
+    with open(disease_features_copy_file, newline='') as features_file:
+        header, *rows = list(csv.reader(features_file))
+    with open(disease_features_copy_file, 'w', newline='') as features_file:
+        csv.writer(features_file).writerows([header] + rows[::-1])
+    os.utime(disease_features_copy_file, ns=(0, index.features_file_mtime + 1))
+    assert os.path.getsize(disease_features_copy_file) == index.features_file_size
+
+    node_describer = NodeDescriber(nodes_reader, edges_file, disease_features_copy_file)
+    for node_index in [5, 6, 9]:
+        assert set(node_describer.get_triples(node_index)) == triples[node_index]
+    assert FeatureIndex.get(disease_features_copy_file).matches(disease_features_copy_file)
+
+
+
+@pytest.fixture
+def server_url(nodes_reader, edges_file, disease_features_copy_file):
+    node_describer = NodeDescriber(nodes_reader, edges_file, disease_features_copy_file, cache_size=4)
+    server = ThreadingHTTPServer(('localhost', 0), get_request_handler(node_describer))
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+
+    yield f'http://localhost:{server.server_address[1]}', node_describer
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _get(url: str, accept: str = None) -> tuple:
+    request = Request(url, headers={} if accept is None else {'Accept': accept})
+    try:
+        with urlopen(request) as response:
+            return response.status, response.headers['Content-Type'], response.read()
+    except HTTPError as e:
+        return e.code, None, None
+
+
+@pytest.mark.parametrize('query, accept, rdf_format, content_type', [
+    ('', None, 'turtle', 'text/turtle; charset=utf-8'),
+    ('?format=ttl', None, 'turtle', 'text/turtle; charset=utf-8'),
+    ('', 'application/n-triples', 'nt', 'application/n-triples; charset=utf-8'),
+    ('?format=nt', 'text/turtle', 'nt', 'application/n-triples; charset=utf-8'),
+    ('?format=ntriples', None, 'nt', 'application/n-triples; charset=utf-8'),
+])
+def test_serve_node_description(server_url, query, accept, rdf_format, content_type):
+    url, node_describer = server_url
+
+    status, response_content_type, content = _get(f'{url}/node/27165{query}', accept)
+
+    assert status == 200
+    assert response_content_type == content_type
+    expected = Graph()
+    for triple in node_describer.get_triples(9):
+        expected.add(triple)
+    assert len(expected) > 0
+    assert isomorphic(Graph().parse(data=content, format=rdf_format), expected)
+
+
+@pytest.mark.parametrize('path, status', [
+    ('/node/unknown', 404),
+    ('/node/', 404),
+    ('/nodes/27165', 404),
+    ('/node/27165?format=xml', 406),
+])
+def test_serve_errors(server_url, path, status):
+    url, _ = server_url
+
+    assert _get(url + path)[0] == status
+
+
+def test_serve_from_cache(server_url):
+    url, node_describer = server_url
+    path = '/node/5090_13608'
+
+    first = _get(url + path)
+    second = _get(url + path)
+
+    assert first == second
+    cache_info = node_describer.get_description.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (1, 1)
+
+    for node_id in ['9796', '7918', 'DB00001', 'DB00002', '8019']:
+        assert _get(f'{url}/node/{node_id}')[0] == 200
+    assert node_describer.get_description.cache_info().currsize == 4
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from primekgtordf.main import main
+from primekgtordf.node import NodesReader
+from primekgtordf.sharednodes import SharedNodeTable
+
+
+def _get_node_fields(nodes) -> list:
+    return [
+        (node.node_index, node.node_id, node.node_type, node.node_name, node.node_source, node.get_uri())
+        for node in nodes
+    ]
+
+
+def test_shared_node_table(nodes_reader):
+    nodes_table = SharedNodeTable.publish(nodes_reader)
+    attached_table = SharedNodeTable.attach(nodes_table.get_name())
+    try:
+        for table in [nodes_table, attached_table]:
+            assert table.get_num_nodes() == nodes_reader.get_num_nodes()
+            assert _get_node_fields(table.get_nodes()) == _get_node_fields(nodes_reader.get_nodes())
+            with pytest.raises(KeyError):
+                table.get_node_by_index(nodes_reader.get_num_nodes())
+    finally:
+        attached_table.close()
+        nodes_table.close()
+        nodes_table.unlink()
+
+
+def test_node_table_file_with_gaps(tmp_path, nodes_file):
+    gaps_nodes_file_path = os.path.join(tmp_path, 'nodes.csv')
+    with open(nodes_file, newline='') as input_file, \
+            open(gaps_nodes_file_path, 'w', newline='') as output_file:
+        for line in input_file:
+            # drops the node with index 7
+            if not line.startswith('7,'):
+                output_file.write(line)
+    nodes_reader = NodesReader(gaps_nodes_file_path)
+    table_file_path = os.path.join(tmp_path, 'nodes.table')
+
+    SharedNodeTable.write_file(nodes_reader, table_file_path)
+    table = SharedNodeTable.open_file(table_file_path)
+    try:
+        assert _get_node_fields(table.get_nodes()) == _get_node_fields(nodes_reader.get_nodes())
+        with pytest.raises(KeyError):
+            table.get_node_by_index(7)
+    finally:
+        table.close()
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'seed_node_indexes': [9], 'hops': 2},
+])
+@pytest.mark.parametrize('workers', [2, 3])
+def test_workers_match_sequential_conversion(
+        tmp_path, nodes_file, edges_file, disease_features_file, drug_features_file,
+        options, workers):
+    output_file_paths = {}
+    for num_workers in [1, workers]:
+        output_file_path = os.path.join(tmp_path, f'primekg-{num_workers}.nt')
+        main(
+            nodes_file,
+            edges_file,
+            output_file_path,
+            disease_features_file,
+            drug_features_file,
+            streaming=True,
+            batch_size=2,
+            workers=num_workers,
+            outputs=[('nq', output_file_path[:-3] + '.nq')],
+            **options
+        )
+        output_file_paths[num_workers] = output_file_path
+
+    for extension in ['.nt', '.nq']:
+        contents = []
+        for output_file_path in output_file_paths.values():
+            with open(output_file_path[:-3] + extension, 'rb') as output_file:
+                contents.append(output_file.read())
+        assert contents[0] == contents[1]
@@ -0,0 +1,110 @@
+import os
+import random
+
+import pytest
+
+from primekgtordf import sort
+from primekgtordf.main import main
+from primekgtordf.sort import diff_sorted, sort_lines
+
+
+@pytest.fixture
+def lines_file(tmp_path) -> str:
+    rng = random.Random(0)
+    lines = [f'<urn:s{rng.randrange(500)}> <urn:p> "{rng.random()}" .\n' for _ in range(2000)]
+    file_path = os.path.join(tmp_path, 'lines.nt')
+    with open(file_path, 'w') as lines_file:
+        # the last line without line break
+        lines_file.write(''.join(lines).rstrip('\n'))
+
+    return file_path
+
+
+@pytest.mark.parametrize('memory_budget, max_fan_in', [
+    (10 ** 9, 64),
+    (4096, 64),
+    (4096, 3),
+])
+def test_sort_lines(tmp_path, lines_file, memory_budget, max_fan_in):
+    output_file_path = os.path.join(tmp_path, 'sorted.nt')
+    tmp_dir_path = os.path.join(tmp_path, 'tmp')
+    os.mkdir(tmp_dir_path)
+
+    sort_lines(lines_file, output_file_path, memory_budget, tmp_dir_path, max_fan_in)
+
+    with open(lines_file, 'rb') as input_file:
+        expected_lines = sorted(line.rstrip(b'\n') + b'\n' for line in input_file)
+    with open(output_file_path, 'rb') as output_file:
+        assert output_file.readlines() == expected_lines
+    assert os.listdir(tmp_dir_path) == []
+
+
+def test_sort_lines_in_place(lines_file):
+    with open(lines_file, 'rb') as input_file:
+        expected_lines = sorted(line.rstrip(b'\n') + b'\n' for line in input_file)
+
+    sort_lines(lines_file, lines_file, 4096, max_fan_in=3)
+
+    with open(lines_file, 'rb') as output_file:
+        assert output_file.readlines() == expected_lines
+
+
+def test_failed_merge_removes_runs(tmp_path, monkeypatch, lines_file):
+    tmp_dir_path = os.path.join(tmp_path, 'tmp')
+    os.mkdir(tmp_dir_path)
+    merge_runs = sort._merge_runs
+    num_merges = []
+
+    def failing_merge_runs(run_file_paths, output_file_path):
+        num_merges.append(1)
+        if len(num_merges) == 3:
+            raise OSError('No space left on device')
+        merge_runs(run_file_paths, output_file_path)
+
+    monkeypatch.setattr(sort, '_merge_runs', failing_merge_runs)
+    with pytest.raises(OSError):
+        sort_lines(lines_file, os.path.join(tmp_path, 'sorted.nt'), 4096, tmp_dir_path, 3)
+
+    assert os.listdir(tmp_dir_path) == []
+
+
+def test_diff_sorted(tmp_path):
+    old_file_path = os.path.join(tmp_path, 'old.nt')
+    new_file_path = os.path.join(tmp_path, 'new.nt')
+    with open(old_file_path, 'wb') as old_file:
+        old_file.write(b'a\nb\nd\n')
+    with open(new_file_path, 'wb') as new_file:
+        new_file.write(b'b\nc\nd\ne\n')
+
+    assert list(diff_sorted(old_file_path, new_file_path)) == [
+        ('-', b'a\n'),
+        ('+', b'c\n'),
+        ('+', b'e\n'),
+    ]
+
+
+def test_sorted_conversion_output(tmp_path, nodes_file, edges_file, drug_features_file):
+    contents = []
+    for workers in [1, 2]:
+        output_file_path = os.path.join(tmp_path, f'primekg-{workers}.nt')
+        main(
+            nodes_file,
+            edges_file,
+            output_file_path,
+            drug_features_file_path=drug_features_file,
+            streaming=True,
+            batch_size=2,
+            workers=workers,
+            sort_output=True,
+            outputs=[('nq', output_file_path[:-3] + '.nq')]
+        )
+        assert not os.path.exists(output_file_path + '.unsorted')
+
+        for extension in ['.nt', '.nq']:
+            with open(output_file_path[:-3] + extension, 'rb') as output_file:
+                lines = output_file.readlines()
+            assert lines == sorted(lines)
+            contents.append((extension, lines))
+
+    # sorting makes the outputs independent of the number of workers
+    assert contents[:2] == contents[2:]
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from primekgtordf import PRIMEKG_URI_PREFIX
+from primekgtordf.main import main
+
+_node_prefix = PRIMEKG_URI_PREFIX + 'node/'
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'relation_types': ['indication', 'drug_protein']},
+    {'node_types': ['drug', 'disease']},
+    {'seed_node_indexes': [9], 'hops': 2},
+    {'disease_columns': ['mondo_name', 'orphanet_prevalence'], 'drug_columns': ['half_life']},
+])
+@pytest.mark.parametrize('batch_size, queue_size', [(10000, 8), (1, 1), (3, 2)])
+def test_streaming_matches_graph(
+        tmp_path, nodes_file, edges_file, disease_features_file, drug_features_file,
+        options, batch_size, queue_size):
+    graph_file_path = os.path.join(tmp_path, 'graph.ttl')
+    streaming_file_path = os.path.join(tmp_path, 'streaming.nt')
+
+    main(
+        nodes_file,
+        edges_file,
+        graph_file_path,
+        disease_features_file,
+        drug_features_file,
+        **options
+    )
+    main(
+        nodes_file,
+        edges_file,
+        streaming_file_path,
+        disease_features_file,
+        drug_features_file,
+        streaming=True,
+        batch_size=batch_size,
+        queue_size=queue_size,
+        **options
+    )
+
+    assert isomorphic(
+        Graph().parse(streaming_file_path, format='nt'),
+        Graph().parse(graph_file_path, format='turtle'))
+
+
+def test_streaming_writes_each_node_once(tmp_path, nodes_file, edges_file):
+    streaming_file_path = os.path.join(tmp_path, 'streaming.nt')
+
+    main(nodes_file, edges_file, streaming_file_path, streaming=True, batch_size=2)
+
+    with open(streaming_file_path) as streaming_file:
+        lines = [line for line in streaming_file if line.startswith('<' + _node_prefix)]
+    # the triples describing a node are written once, only the duplicate
+    # indication edge is written twice
+    duplicates = {line for line in lines if lines.count(line) > 1}
+    assert len(duplicates) == 1
+    assert '/vocab/indication>' in duplicates.pop()
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+from primekgtordf.checkpoint import Checkpoint, CheckpointMismatchException, get_checkpoint_file_path
+from primekgtordf.csvfile import iter_csv_records
+from primekgtordf.stream import convert_streaming
+from primekgtordf.subset import EdgeIndex, SubsetFilter, get_edge_index_file_path
+
+
+def _get_edges(subset_filter: SubsetFilter, edges_file_path: str) -> list:
+    return [
+        (row[0], int(row[2]), int(row[3]))
+        for row, _ in subset_filter.iter_edge_records(edges_file_path)
+    ]
+
+
+@pytest.mark.parametrize('options, expected_edges', [
+    ({'relation_types': ['indication', 'drug_drug']}, [
+        ('indication', 2, 9),
+        ('indication', 2, 9),
+        ('drug_drug', 2, 3),
+        ('drug_drug', 3, 2),
+    ]),
+    ({'node_types': ['drug', 'gene/protein']}, [
+        ('protein_protein', 0, 1),
+        ('protein_protein', 1, 0),
+        ('drug_protein', 2, 0),
+        ('drug_protein', 3, 1),
+        ('drug_protein', 4, 0),
+        ('drug_drug', 2, 3),
+        ('drug_drug', 3, 2),
+    ]),
+    ({'seed_node_indexes': [9], 'hops': 1}, [
+        ('indication', 2, 9),
+        ('indication', 2, 9),
+        ('disease_phenotype_positive', 9, 8),
+        ('disease_disease', 6, 9),
+        ('disease_disease', 9, 6),
+    ]),
+    ({'seed_node_indexes': [9], 'hops': 2}, [
+        ('drug_protein', 2, 0),
+        ('indication', 2, 9),
+        ('indication', 2, 9),
+        ('drug_drug', 2, 3),
+        ('drug_drug', 3, 2),
+        ('disease_phenotype_positive', 9, 8),
+        ('disease_disease', 6, 9),
+        ('disease_disease', 9, 6),
+        ('phenotype_phenotype', 8, 7),
+    ]),
+    ({'seed_node_indexes': [9], 'hops': 2, 'relation_types': ['indication', 'drug_protein']}, [
+        ('drug_protein', 2, 0),
+        ('indication', 2, 9),
+        ('indication', 2, 9),
+    ]),
+])
+def test_subset_edges(nodes_reader, edges_file, options, expected_edges):
+    subset_filter = SubsetFilter(nodes_reader, **options)
+
+    assert _get_edges(subset_filter, edges_file) == expected_edges
+
+
+def test_edge_index_modified_in_place_is_rebuilt(nodes_reader, edges_file):
+    subset_filter = SubsetFilter(nodes_reader, seed_node_indexes=[7], hops=1)
+    assert _get_edges(subset_filter, edges_file) == [
+        ('disease_phenotype_positive', 5, 7),
+        ('phenotype_phenotype', 8, 7),
+    ]
+    index = EdgeIndex.load(get_edge_index_file_path(edges_file))
+
+    # same size, different content
+    with open(edges_file, 'r+b') as modified_file:
+        content = modified_file.read()
+        modified_file.seek(0)
+        modified_file.write(content.replace(b'parent-child,8,7', b'parent-child,7,8'))
+    os.utime(edges_file, ns=(0, index.edges_file_mtime + 1))
+    assert os.path.getsize(edges_file) == index.edges_file_size
+
+    assert _get_edges(subset_filter, edges_file) == [
+        ('disease_phenotype_positive', 5, 7),
+        ('phenotype_phenotype', 7, 8),
+    ]
+    assert EdgeIndex.load(get_edge_index_file_path(edges_file)).matches(edges_file)
+
+
+@pytest.mark.parametrize('resume_options', [
+    {'relation_types': ['indication', 'drug_protein']},
+    {'seed_node_indexes': [9], 'hops': 1},
+    {'seed_node_indexes': [6], 'hops': 2},
+    {'seed_node_indexes': [9], 'hops': 2, 'node_types': ['drug', 'disease']},
+    None,
+])
+def test_resume_rejects_other_subset(tmp_path, nodes_reader, edges_file, resume_options):
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    options = {'subset': SubsetFilter(nodes_reader, seed_node_indexes=[9], hops=2).get_options()}
+    Checkpoint.create([nodes_reader.nodes_file_path, edges_file], options).save(get_checkpoint_file_path(output_file_path))
+
+    subset_filter = None
+    if resume_options is not None:
+        subset_filter = SubsetFilter(nodes_reader, **resume_options)
+    with pytest.raises(CheckpointMismatchException, match='subset'):
+        convert_streaming(
+            nodes_reader, edges_file, output_file_path, resume=True, subset_filter=subset_filter)
+
+
+def test_resume_rejects_checkpoint_without_options(tmp_path, nodes_reader, edges_file):
+    output_file_path = os.path.join(tmp_path, 'primekg.nt')
+    Checkpoint.create([nodes_reader.nodes_file_path, edges_file]).save(
+        get_checkpoint_file_path(output_file_path))
+
+    with pytest.raises(CheckpointMismatchException, match='subset'):
+        convert_streaming(
+            nodes_reader, edges_file, output_file_path, resume=True,
+            subset_filter=SubsetFilter(nodes_reader, seed_node_indexes=[9]))
+
+
+def test_edge_index_entries(tmp_path, nodes_reader, edges_file):
+    expected_entries = {node_index: [] for node_index in range(nodes_reader.get_num_nodes())}
+    start_offset = 0
+    for row, end_offset in iter_csv_records(edges_file):
+        if row[0] != 'relation':
+            subj_node_idx, obj_node_idx = int(row[2]), int(row[3])
+            expected_entries[subj_node_idx].append((obj_node_idx, row[0], start_offset))
+            expected_entries[obj_node_idx].append((subj_node_idx, row[0], start_offset))
+        start_offset = end_offset
+
+    index = EdgeIndex.build(edges_file, nodes_reader.get_num_nodes())
+    index_file_path = os.path.join(tmp_path, 'edges.idx')
+    index.save(index_file_path)
+
+    for loaded_index in [index, EdgeIndex.load(index_file_path)]:
+        assert loaded_index.get_num_nodes() == nodes_reader.get_num_nodes()
+        for node_index, entries in expected_entries.items():
+            assert list(loaded_index.get_entries(node_index)) == entries
@@ -0,0 +1,96 @@
+import logging
+import os
+
+import pytest
+
+from primekgtordf.main import main
+from primekgtordf.verify import get_chunks, get_manifest_file_path, verify
+
+
+@pytest.fixture
+def outputs(tmp_path, nodes_file, edges_file, disease_features_file, drug_features_file) -> dict:
+    outputs = {
+        'nt': os.path.join(tmp_path, 'primekg.nt'),
+        'nq': os.path.join(tmp_path, 'primekg.nq'),
+        'xml': os.path.join(tmp_path, 'primekg.xml'),
+    }
+    main(
+        nodes_file,
+        edges_file,
+        outputs['nt'],
+        disease_features_file,
+        drug_features_file,
+        streaming=True,
+        outputs=[('nq', outputs['nq']), ('xml', outputs['xml'])]
+    )
+
+    return outputs
+
+
+def _replace(file_path: str, old: bytes, new: bytes):
+    with open(file_path, 'rb') as output_file:
+        content = output_file.read()
+    with open(file_path, 'wb') as output_file:
+        output_file.write(content.replace(old, new, 1))
+
+
+def test_get_chunks(outputs):
+    size = os.path.getsize(outputs['nt'])
+    chunks = get_chunks(outputs['nt'], 1000)
+
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0 and chunks[-1][1] == size
+    with open(outputs['nt'], 'rb') as output_file:
+        for (_, end), (next_start, _) in zip(chunks, chunks[1:]):
+            assert end == next_start
+            output_file.seek(end - 1)
+            assert output_file.read(1) == b'\n'
+
+
+@pytest.mark.parametrize('workers, chunk_size', [(1, 64 * 1024 * 1024), (2, 1000)])
+def test_verify_complete_outputs(outputs, workers, chunk_size):
+    assert verify(get_manifest_file_path(outputs['nt']), workers, chunk_size)
+
+
+@pytest.mark.parametrize('output', ['nt', 'nq'])
+def test_verify_reports_syntax_error_offset(caplog, outputs, output):
+    with open(outputs[output], 'rb') as output_file:
+        content = output_file.read()
+    # same size, so only the checksum and parsing find the corruption
+    offset = content.index(b'> .\n', len(content) // 2)
+    _replace(outputs[output], content[offset:offset + 4], b'> ;\n')
+
+    with caplog.at_level(logging.ERROR):
+        assert not verify(get_manifest_file_path(outputs['nt']), workers=2, chunk_size=1000)
+
+    assert 'checksum mismatch' in caplog.text
+    assert 'syntax errors' in caplog.text
+    assert 'at byte offset' in caplog.text
+
+
+def test_verify_reports_truncated_output(caplog, outputs):
+    with open(outputs['nt'], 'r+b') as output_file:
+        output_file.truncate(os.path.getsize(outputs['nt']) // 2)
+
+    with caplog.at_level(logging.ERROR):
+        assert not verify(get_manifest_file_path(outputs['nt']), workers=1)
+
+    assert 'instead of' in caplog.text
+
+
+def test_verify_reports_corrupt_rdflib_output(caplog, outputs):
+    _replace(outputs['xml'], b'</rdf:RDF>', b'</rdf:RDFX>')
+
+    with caplog.at_level(logging.ERROR):
+        assert not verify(get_manifest_file_path(outputs['nt']), workers=1)
+
+    assert outputs['xml'] in caplog.text
+
+
+def test_verify_reports_missing_output(caplog, outputs):
+    os.remove(outputs['nq'])
+
+    with caplog.at_level(logging.ERROR):
+        assert not verify(get_manifest_file_path(outputs['nt']), workers=1)
+
+    assert f'{outputs["nq"]}: missing' in caplog.text